@@ -1,8 +1,22 @@
+from gaia.board.hexagons import Hexagon
+from gaia.board.buildings import Building
 from gaia.board.map_loader import MapLoader
+from gaia.board.map_serializer import JSONEncoder
+from gaia.board.binary_map import BINARY_MAP_MIMETYPE, encode_map
+from gaia.utils.lru_cache import LRUCache
+from gaia.utils.streaming import GameStream, StreamEvent
+from gaia.utils.enums import Factions, BuildingType
 
 import os
+import uuid
+import threading
+from contextlib import nullcontext
+import json
+import gzip
+import hashlib
+from datetime import datetime, timezone
 import example_responses
-from flask import Flask, Response, render_template, request
+from flask import Flask, Response, render_template, request, stream_with_context
 from flask_restplus import Resource, Api
 
 app = Flask(__name__)
@@ -11,6 +25,79 @@ api = Api(app)
 config_path = os.path.join(os.path.dirname(os.path.realpath(__file__)), "configs", "board.json")
 is_development = os.environ.get("FLASK_DEBUG") == str(1)
 
+# Pre-serialized /map bodies, keyed by (game_id, game_type, board_options, config modification time, map version, mimetype)
+map_response_cache = LRUCache(max_size=32)
+# Games in progress (started with POST /games), by game id. Clients can follow their maps with /map/changes or
+# /map/stream instead of reloading them. The least recently used game is dropped, closing its stream, once there
+# are more than MAX_LIVE_GAMES.
+MAX_LIVE_GAMES = 64
+live_games = LRUCache(max_size=MAX_LIVE_GAMES, on_evict=lambda game_id, game: game.stream.close())
+# Seconds between keep-alive comments on idle streams
+STREAM_KEEP_ALIVE_INTERVAL = 15
+# Board options that produce a different (random) board on every request, so their responses are never cached.
+# Requests with an empty game_type get a random layout, so they are never cached either.
+RANDOM_BOARD_OPTIONS = {"lots_o_buildings"}
+
+
+class SerializedMap(object):
+    def __init__(self, body: bytes, mimetype: str):
+        self.body = body
+        self.mimetype = mimetype
+        self.etag = hashlib.sha1(self.body).hexdigest()
+        self._gzipped_body = None
+
+    @property
+    def gzipped_body(self) -> bytes:
+        if self._gzipped_body is None:
+            self._gzipped_body = gzip.compress(self.body)
+        return self._gzipped_body
+
+
+def make_map_response(serialized_map: SerializedMap, last_modified: datetime = None) -> Response:
+    use_gzip = "gzip" in request.accept_encodings
+    response = Response(response=serialized_map.gzipped_body if use_gzip else serialized_map.body,
+                        status=200,
+                        mimetype=serialized_map.mimetype)
+    if use_gzip:
+        response.headers["Content-Encoding"] = "gzip"
+    response.vary.add("Accept-Encoding")
+    response.vary.add("Accept")
+
+    # The compressed body is a different representation, so it must not share the ETag of the uncompressed one
+    response.set_etag(serialized_map.etag + "-gz" if use_gzip else serialized_map.etag)
+    if last_modified is not None:
+        response.last_modified = last_modified
+
+    # Answers 304 Not Modified if the client already has this version of the map
+    return response.make_conditional(request)
+
+
+def serialize_map(map, mimetype: str) -> SerializedMap:
+    if mimetype == BINARY_MAP_MIMETYPE:
+        return SerializedMap(encode_map(map), mimetype)
+    return SerializedMap(map.to_json().encode("utf-8"), mimetype)
+
+
+class LiveGame(object):
+    """
+    The map of a game in progress, and the stream pushing its changes to subscribed clients
+    """
+    def __init__(self, game_type: str):
+        self.map = MapLoader.load_from_config(config_path, game_type=game_type)
+        # Held while the map is changed or read. Stream snapshots are taken on the threads of the subscribed
+        # clients, which would otherwise serialize the map while another request changes it.
+        self.lock = threading.RLock()
+        self.stream = GameStream(self.snapshot_event)
+        self.map.add_change_listener(lambda change: self.stream.publish(StreamEvent("change", change)))
+
+    def snapshot_event(self) -> StreamEvent:
+        with self.lock:
+            return StreamEvent("snapshot", {"version": self.map.version, "snapshot": json.loads(self.map.to_json())})
+
+
+def unknown_game_response(game_id: str):
+    return {"message": "There is no game with id {}".format(game_id)}, 404
+
 
 # View Routes
 @app.route('/board')
@@ -19,6 +106,17 @@ def main():
 
 
 # API
+@api.route('/games')
+class Games(Resource):
+    def post(self):
+        """
+        Starts a live game, whose map clients can then load and follow by its game id
+        """
+        game_id = str(uuid.uuid4())
+        live_games.put(game_id, LiveGame(request.args.get('game_type', '1p_2p_default')))
+        return {"game_id": game_id}, 201
+
+
 @api.route('/valid-moves')
 class ValidMoves(Resource):
     def get(self):
@@ -30,14 +128,113 @@ class Maps(Resource):
     def get(self):
         game_type = request.args.get('game_type', '1p_2p_default')
         board_options = request.args.get('board_options', None)
+        game_id = request.args.get('game_id', None)
+        # Clients that accept it get the compact binary encoding of the map instead of JSON
+        mimetype = request.accept_mimetypes.best_match(["application/json", BINARY_MAP_MIMETYPE],
+                                                       default="application/json")
+
+        if game_id is not None:
+            game = live_games.get(game_id)
+            if game is None:
+                return unknown_game_response(game_id)
+            map, lock = game.map, game.lock
+        else:
+            map, lock = MapLoader.load_from_config(config_path, game_type=game_type), nullcontext()
+            if board_options == "lots_o_buildings":
+                map.add_buildings_to_all_planets()
+            if board_options == "lots_o_federations":
+                # TODO: Add code to randomly generate federations
+                pass
+
+        is_random = game_id is None and (not game_type or board_options in RANDOM_BOARD_OPTIONS)
+        with lock:
+            if is_random:
+                response = make_map_response(serialize_map(map, mimetype))
+            else:
+                config_mtime = os.stat(config_path).st_mtime
+                cache_key = (game_id, game_type, board_options, config_mtime, map.version, mimetype)
+                serialized_map = map_response_cache.get_or_compute(cache_key, lambda: serialize_map(map, mimetype))
+                # Live maps change after the config was last modified, so they are only revalidated by their ETag
+                last_modified = datetime.fromtimestamp(config_mtime, timezone.utc) if game_id is None else None
+                response = make_map_response(serialized_map, last_modified)
 
-        map = MapLoader.load_from_config(config_path, game_type=game_type)
-        if board_options == "lots_o_buildings":
-            map.add_buildings_to_all_planets()
-        if board_options == "lots_o_federations":
-            # TODO: Add code to randomly generate federations
-            pass
+            response.headers["X-Map-Version"] = str(map.version)
+        return response
 
-        return Response(response=map.to_json(),
+
+@api.route('/map/changes')
+class MapChanges(Resource):
+    def get(self):
+        """
+        The changes to a live map since the version given by the client.
+        Falls back to a full snapshot of the map if the client is too far behind.
+        """
+        game_id = request.args.get('game_id')
+        since = request.args.get('since', -1, type=int)
+
+        game = live_games.get(game_id)
+        if game is None:
+            return unknown_game_response(game_id)
+        map = game.map
+
+        with game.lock:
+            changes = map.changes_since(since)
+            if changes is None:
+                body = '{"version": ' + str(map.version) + ', "snapshot": ' + map.to_json() + '}'
+            else:
+                body = json.dumps({"version": map.version, "changes": changes}, cls=JSONEncoder)
+
+        return Response(response=body,
                         status=200,
                         mimetype="application/json")
+
+
+@api.route('/map/buildings')
+class MapBuildings(Resource):
+    def put(self):
+        """
+        Places a building on a planet of a live map, i.e.
+        {"game_id": "...", "x": 1, "z": -1, "faction": 0, "building_type": 0}
+        """
+        body = request.get_json(force=True, silent=True) or dict()
+        game_id = body.get('game_id')
+        game = live_games.get(game_id)
+        if game is None:
+            return unknown_game_response(game_id)
+
+        try:
+            hexagon = Hexagon(int(body['x']), int(body['z']))
+            building = Building(Factions(body['faction']), BuildingType(body['building_type']))
+        except (KeyError, TypeError, ValueError):
+            return {"message": "A building needs a hexagon (x, z), a faction and a building type"}, 400
+
+        with game.lock:
+            if not game.map.inhabit_planet(hexagon, building):
+                return {"message": "There is no planet at ({}, {})".format(hexagon.x, hexagon.z)}, 400
+            return {"version": game.map.version}
+
+
+@app.route('/map/stream')
+def stream_map():
+    """
+    Server-sent events for a live map: a snapshot first, then every change
+    """
+    game = live_games.get(request.args.get('game_id'))
+    if game is None:
+        return Response(status=404)
+    stream = game.stream
+
+    # So no change is made between the snapshot and the subscription
+    with game.lock:
+        subscription = stream.subscribe()
+
+    def events():
+        try:
+            while not subscription.closed:
+                event = subscription.get(timeout=STREAM_KEEP_ALIVE_INTERVAL)
+                yield event.to_sse(JSONEncoder) if event is not None else ": keep-alive\n\n"
+        finally:
+            stream.unsubscribe(subscription)
+
+    return Response(stream_with_context(events()), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
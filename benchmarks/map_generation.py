@@ -0,0 +1,37 @@
+"""
+Measures how many random layouts per second the MapGenerator can generate and score.
+
+Run from the repository root:
+    python -m benchmarks.map_generation
+"""
+import os
+import time
+
+from gaia.board.map_loader import MapLoader
+
+CONFIG_PATH = os.path.join(os.path.dirname(os.path.realpath(__file__)), "..", "configs", "board.json")
+
+
+def main(batch_size=10000, num_batches=10, max_score=0):
+    generator = MapLoader.get_map_generator(CONFIG_PATH)
+    generator.seed(0)
+
+    start = time.perf_counter()
+    num_balanced = 0
+    for i in range(num_batches):
+        layouts = generator.random_layouts(batch_size)
+        num_balanced += (generator.score_layouts(layouts) <= max_score).sum()
+    elapsed = time.perf_counter() - start
+
+    print("Generated and scored {} layouts in {:.2f}s ({:.0f} layouts/s), {} with a score <= {}".format(
+        batch_size * num_batches, elapsed, batch_size * num_batches / elapsed, num_balanced, max_score))
+
+    start = time.perf_counter()
+    for i in range(100):
+        generator.to_map(layouts, i)
+    elapsed = time.perf_counter() - start
+    print("Built 100 Maps from layouts in {:.2f}s ({:.0f} maps/s)".format(elapsed, 100 / elapsed))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+from __future__ import annotations
+from typing import Tuple
+import struct
+
+import numpy as np
+
+from gaia.board.map import Map
+
+# Compact binary encoding of a map, sent by /map to clients that accept BINARY_MAP_MIMETYPE.
+# All values are little endian, and every per-hexagon field is a packed array:
+#
+#     header:       magic (4s), format version (B), padding (x), map version (I),
+#                   number of sectors (H), number of hexagons (H), number of federations (H)
+#     sectors:      hexagon counts (H[sectors]), x offsets (b[sectors]), z offsets (b[sectors]), radii (B[sectors])
+#     hexagons:     x (b[hexagons]), z (b[hexagons]), planet types (B[hexagons]),
+#                   building factions (B[hexagons]), building types (B[hexagons])
+#     federations:  per federation: faction (B), activated (B), number of hexagons (H), then x, z (b, b) per hexagon
+#
+# Hexagons are grouped by sector, in sector order. Missing planets and buildings are encoded as NONE.
+# The hexagon counts come right after the 16 byte header, so they are aligned for a Uint16Array in map.jsx.
+BINARY_MAP_MIMETYPE = "application/vnd.gaia.map"
+MAGIC = b"GMAP"
+FORMAT_VERSION = 2
+NONE = 255
+
+HEADER = struct.Struct("<4sBxIHHH")
+FEDERATION_HEADER = struct.Struct("<BBH")
+
+
+def pack_array(values: list, dtype) -> bytes:
+    """
+    Packs the values as an array of dtype, refusing values out of its range instead of wrapping them around
+    """
+    array = np.array(values, dtype=np.int64)
+    info = np.iinfo(dtype)
+    assert array.size == 0 or (info.min <= array.min() and array.max() <= info.max), \
+        "Values from {} to {} cannot be encoded as {}".format(array.min(), array.max(), np.dtype(dtype).name)
+    return array.astype(dtype).tobytes()
+
+
+def encode_map(game_map: Map) -> bytes:
+    hexagons = [sorted(sector.hexagons, key=lambda h: h.key) for sector in game_map.sectors]
+    all_hexagons = [hexagon for sector_hexagons in hexagons for hexagon in sector_hexagons]
+
+    planets = [hexagon.planet for hexagon in all_hexagons]
+    buildings = [planet.building if planet is not None else None for planet in planets]
+
+    parts = [
+        HEADER.pack(MAGIC, FORMAT_VERSION, game_map.version, len(game_map.sectors), len(all_hexagons),
+                    len(game_map.federations)),
+        pack_array([len(sector_hexagons) for sector_hexagons in hexagons], "<u2"),
+        pack_array([sector.x_offset for sector in game_map.sectors], np.int8),
+        pack_array([sector.z_offset for sector in game_map.sectors], np.int8),
+        pack_array([sector.radius for sector in game_map.sectors], np.uint8),
+        pack_array([hexagon.x for hexagon in all_hexagons], np.int8),
+        pack_array([hexagon.z for hexagon in all_hexagons], np.int8),
+        pack_array([planet.planet_type if planet else NONE for planet in planets], np.uint8),
+        pack_array([building.faction if building else NONE for building in buildings], np.uint8),
+        pack_array([building.building_type if building else NONE for building in buildings], np.uint8)
+    ]
+
+    for federation in game_map.federations:
+        parts.append(FEDERATION_HEADER.pack(federation.faction, federation.activated, len(federation.hexagons)))
+        parts.append(pack_array([coordinate for h in federation.hexagons for coordinate in (h.x, h.z)], np.int8))
+
+    return b"".join(parts)
+
+
+def decode_map(data: bytes) -> dict:
+    """
+    Decodes an encoded map to the same structure as the JSON returned by Map.to_json
+    (plus the map version), the Python counterpart of decodeBinaryMap in map.jsx
+    """
+    magic, version, map_version, num_sectors, num_hexagons, num_federations = HEADER.unpack_from(data, 0)
+    assert magic == MAGIC and version == FORMAT_VERSION, "Not an encoded map"
+    offset = HEADER.size
+
+    def read_array(dtype, count) -> Tuple[list, int]:
+        array = np.frombuffer(data, dtype=dtype, count=count, offset=offset)
+        return array.tolist(), offset + array.nbytes
+
+    hexagon_counts, offset = read_array("<u2", num_sectors)
+    x_offsets, offset = read_array(np.int8, num_sectors)
+    z_offsets, offset = read_array(np.int8, num_sectors)
+    radii, offset = read_array(np.uint8, num_sectors)
+    xs, offset = read_array(np.int8, num_hexagons)
+    zs, offset = read_array(np.int8, num_hexagons)
+    planet_types, offset = read_array(np.uint8, num_hexagons)
+    factions, offset = read_array(np.uint8, num_hexagons)
+    building_types, offset = read_array(np.uint8, num_hexagons)
+
+    def screen_factors(x, z):
+        q, r = x + z, -x
+        return q * (3 / 2), (3 ** 0.5 / 2) * q + (3 ** 0.5) * r
+
+    sectors, hexagon_index = [], 0
+    for i in range(num_sectors):
+        sector_x, sector_y = screen_factors(x_offsets[i], z_offsets[i])
+        hexagons = []
+        for j in range(hexagon_index, hexagon_index + hexagon_counts[i]):
+            screen_x, screen_y = screen_factors(xs[j], zs[j])
+            planet = None
+            if planet_types[j] != NONE:
+                building = None if factions[j] == NONE else {"faction": factions[j],
+                                                             "building_type": building_types[j]}
+                planet = {"planet_type": planet_types[j], "building": building}
+            hexagons.append({"x": xs[j], "z": zs[j], "screen_x_factor": screen_x, "screen_y_factor": screen_y,
+                             "planet": planet})
+        hexagon_index += hexagon_counts[i]
+
+        sectors.append({"radius": radii[i], "x_offset": x_offsets[i], "z_offset": z_offsets[i],
+                        "screen_x_factor": sector_x, "screen_y_factor": sector_y, "hexagons": hexagons})
+
+    federations = []
+    for i in range(num_federations):
+        faction, activated, num_federation_hexagons = FEDERATION_HEADER.unpack_from(data, offset)
+        offset += FEDERATION_HEADER.size
+        coordinates, offset = read_array(np.int8, 2 * num_federation_hexagons)
+        federations.append({"faction": faction, "activated": bool(activated),
+                            "hexagons": [{"x": x, "z": z} for x, z in zip(coordinates[::2], coordinates[1::2])]})
+
+    return {"version": map_version, "sectors": sectors, "federations": federations}
@@ -0,0 +1,119 @@
+from __future__ import annotations
+from typing import Dict, List
+import mmap
+import struct
+
+import numpy as np
+
+from gaia.utils.enums import PlanetType
+from gaia.board.hexagons import Hexagon
+from gaia.board.planets import Planet
+from gaia.board.sectors import Sector
+from gaia.board.map import Map
+
+# Binary format of a compiled layouts file (all values little endian):
+#
+#     header:     magic (4s), format version (H), number of layouts (H)
+#     directory:  per layout: name length (B), name (utf-8), number of sectors (H), number of planets (H),
+#                             sector table offset (I), planet table offset (I)
+#     sectors:    per sector: x offset (b), z offset (b), radius (B), padding (x)
+#     planets:    per planet: x (b), z (b), planet type (B), sector index (B)
+MAGIC = b"GAIA"
+FORMAT_VERSION = 1
+
+HEADER = struct.Struct("<4sHH")
+DIRECTORY_ENTRY = struct.Struct("<HHII")
+SECTOR = struct.Struct("<bbBx")
+PLANET = struct.Struct("<bbBB")
+
+SECTOR_DTYPE = np.dtype([("x_offset", "i1"), ("z_offset", "i1"), ("radius", "u1"), ("padding", "u1")])
+PLANET_DTYPE = np.dtype([("x", "i1"), ("z", "i1"), ("planet_type", "u1"), ("sector", "u1")])
+
+
+class InvalidCompiledLayoutsException(Exception):
+    pass
+
+
+def compile_layouts(layouts: Dict[str, Map]) -> bytes:
+    names = [name.encode("utf-8") for name in layouts]
+    directory_size = sum(1 + len(name) + DIRECTORY_ENTRY.size for name in names)
+
+    directory, tables = [], []
+    offset = HEADER.size + directory_size
+
+    for name, game_map in zip(names, layouts.values()):
+        sectors, planets = [], []
+        for sector_index, sector in enumerate(game_map.sectors):
+            sectors.append(SECTOR.pack(sector.x_offset, sector.z_offset, sector.radius))
+            planets.extend(PLANET.pack(h.x, h.z, h.planet.planet_type, sector_index)
+                           for h in sorted(sector.hexagons, key=lambda h: h.key) if h.planet is not None)
+
+        sector_table_offset, planet_table_offset = offset, offset + len(sectors) * SECTOR.size
+        offset = planet_table_offset + len(planets) * PLANET.size
+
+        directory.append(struct.pack("<B", len(name)) + name +
+                         DIRECTORY_ENTRY.pack(len(sectors), len(planets), sector_table_offset, planet_table_offset))
+        tables.extend(sectors + planets)
+
+    return b"".join([HEADER.pack(MAGIC, FORMAT_VERSION, len(names))] + directory + tables)
+
+
+class CompiledLayout(object):
+    """
+    A single layout inside a compiled layouts file. The sector and planet tables are
+    read-only arrays over the underlying buffer, nothing is copied until to_map is called.
+    """
+    def __init__(self, name: str, sectors: np.ndarray, planets: np.ndarray):
+        self.name = name
+        self.sectors = sectors
+        self.planets = planets
+
+    def to_map(self) -> Map:
+        planet_hexagons = [set() for _ in range(len(self.sectors))]
+        for x, z, planet_type, sector_index in self.planets.tolist():
+            planet_hexagons[sector_index].add(Hexagon(x, z, Planet(PlanetType(planet_type))))
+
+        sectors = []
+        for (x_offset, z_offset, radius, _), hexagons in zip(self.sectors.tolist(), planet_hexagons):
+            relative_hexagons = {h.adjust_offset(-x_offset, -z_offset) for h in hexagons}
+            sectors.append(Sector(relative_hexagons, radius=radius, x_offset=x_offset, z_offset=z_offset))
+
+        return Map(sectors, [])
+
+
+class CompiledLayouts(object):
+    """
+    Memory maps a compiled layouts file. Only the header and directory are parsed up front.
+    """
+    def __init__(self, path: str):
+        with open(path, "rb") as compiled_file:
+            self._buffer = mmap.mmap(compiled_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if len(self._buffer) < HEADER.size:
+            raise InvalidCompiledLayoutsException("{} is too short to be a compiled layouts file".format(path))
+        magic, version, num_layouts = HEADER.unpack_from(self._buffer, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise InvalidCompiledLayoutsException("{} is not a compiled layouts file of version {}"
+                                                  .format(path, FORMAT_VERSION))
+
+        self._directory = dict()
+        offset = HEADER.size
+        for i in range(num_layouts):
+            name_length = self._buffer[offset]
+            name = bytes(self._buffer[offset + 1:offset + 1 + name_length]).decode("utf-8")
+            offset += 1 + name_length
+            self._directory[name] = DIRECTORY_ENTRY.unpack_from(self._buffer, offset)
+            offset += DIRECTORY_ENTRY.size
+
+    @property
+    def names(self) -> List[str]:
+        return list(self._directory)
+
+    def __getitem__(self, name: str) -> CompiledLayout:
+        num_sectors, num_planets, sector_table_offset, planet_table_offset = self._directory[name]
+        sectors = np.frombuffer(self._buffer, dtype=SECTOR_DTYPE, count=num_sectors, offset=sector_table_offset)
+        planets = np.frombuffer(self._buffer, dtype=PLANET_DTYPE, count=num_planets, offset=planet_table_offset)
+        return CompiledLayout(name, sectors, planets)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._directory
@@ -0,0 +1,98 @@
+from __future__ import annotations
+from typing import List, Tuple, Union
+
+import numpy as np
+
+from gaia.board.buildings import Building
+from gaia.utils.enums import Factions
+
+
+class DenseBoard(object):
+    """
+    Array-backed view of a Map, used for bulk analysis and simulation.
+    Once enabled with Map.enable_dense_board, the map answers its range, distance and reachability queries from it.
+
+    The axial grid covering every sector is stored as 2D arrays indexed by [x - min_x, z - min_z].
+    Cells that are not on the map have a sector id of NONE, and cells without a planet/building
+    have a planet type, faction and building type of NONE.
+    """
+    NONE = -1
+
+    def __init__(self, sectors):
+        hexagons = [(sector_id, hexagon) for sector_id, sector in enumerate(sectors) for hexagon in sector.hexagons]
+        xs = [hexagon.x for _, hexagon in hexagons]
+        zs = [hexagon.z for _, hexagon in hexagons]
+
+        self.min_x, self.min_z = (min(xs), min(zs)) if hexagons else (0, 0)
+        shape = (max(xs) - self.min_x + 1, max(zs) - self.min_z + 1) if hexagons else (0, 0)
+
+        self.x, self.z = np.indices(shape, dtype=np.int16)
+        self.x += self.min_x
+        self.z += self.min_z
+
+        self.sector_ids = np.full(shape, self.NONE, dtype=np.int8)
+        self.planet_types = np.full(shape, self.NONE, dtype=np.int8)
+        self.factions = np.full(shape, self.NONE, dtype=np.int8)
+        self.building_types = np.full(shape, self.NONE, dtype=np.int8)
+
+        for sector_id, hexagon in hexagons:
+            cell = self._cell(hexagon.x, hexagon.z)
+            self.sector_ids[cell] = sector_id
+            if hexagon.planet is not None:
+                self.planet_types[cell] = hexagon.planet.planet_type
+                self.set_building(hexagon.x, hexagon.z, hexagon.planet.building)
+
+    def _cell(self, x: int, z: int) -> Tuple[int, int]:
+        return x - self.min_x, z - self.min_z
+
+    @property
+    def on_map(self) -> np.ndarray:
+        return self.sector_ids != self.NONE
+
+    @property
+    def has_planet(self) -> np.ndarray:
+        return self.planet_types != self.NONE
+
+    def set_building(self, x: int, z: int, building: Union[Building, None]):
+        cell = self._cell(x, z)
+        if building is None:
+            self.factions[cell] = self.building_types[cell] = self.NONE
+        else:
+            self.factions[cell] = building.faction
+            self.building_types[cell] = building.building_type
+
+    def occupied(self, faction: Union[Factions, None] = None) -> np.ndarray:
+        """
+        Mask of the cells holding a building, optionally only the buildings of the given faction
+        """
+        if faction is None:
+            return self.factions != self.NONE
+        return self.factions == faction
+
+    def distances_from(self, x, z) -> np.ndarray:
+        """
+        Hex distance from (x, z) to every cell of the grid.
+        x and z may also be arrays of coordinates, in which case one grid of distances is returned per coordinate.
+        """
+        dx = self.x - np.asarray(x, dtype=np.int16)[..., np.newaxis, np.newaxis]
+        dz = self.z - np.asarray(z, dtype=np.int16)[..., np.newaxis, np.newaxis]
+        return (np.abs(dx) + np.abs(dz) + np.abs(dx + dz)) // 2
+
+    def in_range(self, x, z, distance: int) -> np.ndarray:
+        return (self.distances_from(x, z) <= distance) & self.on_map
+
+    def get_coordinates_in_range(self, x: int, z: int, distance: int) -> List[Tuple[int, int]]:
+        mask = self.in_range(x, z, distance)
+        return list(zip(self.x[mask].tolist(), self.z[mask].tolist()))
+
+    def faction_has_building_in_range(self, faction: Factions, x: int, z: int, distance: int) -> bool:
+        return bool(np.any(self.in_range(x, z, distance) & self.occupied(faction)))
+
+    def get_distance_to_faction(self, faction: Factions) -> np.ndarray:
+        """
+        For every cell, the distance to the closest building of the faction (or NONE if it has no buildings)
+        """
+        occupied = self.occupied(faction)
+        if not occupied.any():
+            return np.full(self.x.shape, self.NONE, dtype=np.int16)
+        return self.distances_from(self.x[occupied], self.z[occupied]).min(axis=0)
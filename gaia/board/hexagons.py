@@ -1,17 +1,79 @@
 from __future__ import annotations
-from dataclasses import dataclass
-from typing import Union, Set
+from typing import Union, Set, Dict, Tuple, Iterator
+from functools import lru_cache
 from math import sqrt
 
 from gaia.board.planets import Planet
-from gaia.utils.utils import CustomJSONSerialization, obj_to_json
+from gaia.utils.utils import CustomJSONSerialization
+
+# Axial (x, z) directions, in the order they are walked around a ring
+AXIAL_DIRECTIONS = ((1, 0), (1, -1), (0, -1), (-1, 0), (-1, 1), (0, 1))
+
+
+@lru_cache(maxsize=None)
+def get_ring_offsets(distance: int) -> Tuple[Tuple[int, int], ...]:
+    """
+    The axial offsets of every hexagon exactly `distance` away from the origin, in walking order
+    """
+    if distance == 0:
+        return (0, 0),
+
+    offsets = []
+    x, z = distance * AXIAL_DIRECTIONS[4][0], distance * AXIAL_DIRECTIONS[4][1]
+    for dx, dz in AXIAL_DIRECTIONS:
+        for i in range(distance):
+            offsets.append((x, z))
+            x, z = x + dx, z + dz
+    return tuple(offsets)
+
+
+@lru_cache(maxsize=None)
+def get_range_offsets(distance: int) -> Tuple[Tuple[int, int], ...]:
+    """
+    The axial offsets of every hexagon at most `distance` away from the origin, ordered ring by ring
+    """
+    return tuple(offset for ring in range(distance + 1) for offset in get_ring_offsets(ring))
 
 
-@dataclass(frozen=True)
 class Hexagon(CustomJSONSerialization):
-    x: int
-    z: int
-    planet: Union[Planet, None] = None
+    """
+    A single hexagon on the board, in axial (x, z) coordinates.
+
+    Hexagons without a planet are interned, so there is only ever one planet-less instance per coordinate.
+    Equality and hashing are based on the coordinates packed into a single integer.
+    """
+    __slots__ = ("x", "z", "planet", "key")
+
+    _COORDINATE_BITS = 16
+    _COORDINATE_OFFSET = 1 << (_COORDINATE_BITS - 1)
+    _interned = dict()  # type: Dict[int, Hexagon]
+
+    def __new__(cls, x: int, z: int, planet: Union[Planet, None] = None):
+        key = cls.pack_coordinates(x, z)
+        if planet is None:
+            hexagon = cls._interned.get(key)
+            if hexagon is not None:
+                return hexagon
+
+        hexagon = object.__new__(cls)
+        object.__setattr__(hexagon, "x", x)
+        object.__setattr__(hexagon, "z", z)
+        object.__setattr__(hexagon, "planet", planet)
+        object.__setattr__(hexagon, "key", key)
+
+        if planet is None:
+            cls._interned[key] = hexagon
+        return hexagon
+
+    @classmethod
+    def pack_coordinates(cls, x: int, z: int) -> int:
+        return ((x + cls._COORDINATE_OFFSET) << cls._COORDINATE_BITS) | (z + cls._COORDINATE_OFFSET)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Hexagon is immutable")
+
+    def __reduce__(self):
+        return Hexagon, (self.x, self.z, self.planet)
 
     @property
     def y(self) -> int:
@@ -45,32 +107,55 @@ class Hexagon(CustomJSONSerialization):
         num_turns = degrees // 60
         for i in range(num_turns):
             x, y, z = -z, -x, -y
-        return Hexagon(x, z)
+        return Hexagon(x, z, planet=self.planet)
 
     def adjust_offset(self, x_offset_diff: int, z_offset_diff: int) -> Hexagon:
         return Hexagon(self.x + x_offset_diff, self.z + z_offset_diff, planet=self.planet)
 
-    def get_hexagons_in_range(self, distance: int) -> Set[Hexagon]:
-        hexagons = set()
-
-        for x in range(self.x - distance, self.x + distance + 1):
-            for z in range(self.z - distance, self.z + distance + 1):
-                if self.distance_from_coordinates(x, z) <= distance:
-                    hexagons.add(Hexagon(x, z))
+    @classmethod
+    @lru_cache(maxsize=None)
+    def get_ring_key_offsets(cls, distance: int) -> Tuple[int, ...]:
+        """
+        The offsets from get_ring_offsets, pre-packed so that hexagon.key + offset is the key of the neighbour
+        """
+        return tuple((dx << cls._COORDINATE_BITS) + dz for dx, dz in get_ring_offsets(distance))
+
+    @classmethod
+    @lru_cache(maxsize=None)
+    def get_range_key_offsets(cls, distance: int) -> Tuple[int, ...]:
+        """
+        The offsets from get_range_offsets, pre-packed so that hexagon.key + offset is the key of the neighbour
+        """
+        return tuple((dx << cls._COORDINATE_BITS) + dz for dx, dz in get_range_offsets(distance))
+
+    def ring(self, distance: int) -> Iterator[Hexagon]:
+        for dx, dz in get_ring_offsets(distance):
+            yield Hexagon(self.x + dx, self.z + dz)
+
+    def spiral(self, distance: int) -> Iterator[Hexagon]:
+        for dx, dz in get_range_offsets(distance):
+            yield Hexagon(self.x + dx, self.z + dz)
 
-        return hexagons
+    def get_hexagons_in_range(self, distance: int) -> Set[Hexagon]:
+        return set(self.spiral(distance))
 
     def to_json(self):
-        return obj_to_json(self, {
+        return {
+            "x": self.x,
+            "z": self.z,
+            "planet": self.planet,
             "screen_x_factor": self.screen_x_factor,
             "screen_y_factor": self.screen_y_factor
-        })
+        }
 
     def __str__(self) -> str:
         return "({0.x},{0.z})".format(self)
 
+    def __repr__(self) -> str:
+        return "Hexagon(x={0.x}, z={0.z}, planet={0.planet!r})".format(self)
+
     def __eq__(self, other):
-        return self.x == other.x and self.z == other.z
+        return self.key == other.key
 
     def __hash__(self):
-        return (str(self.x) + ',' + str(self.z)).__hash__()
+        return self.key
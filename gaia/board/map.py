@@ -1,67 +1,351 @@
 from __future__ import annotations
-from typing import List, Set
-from dataclasses import dataclass
-import json
+from typing import List, Set, Dict, Union, Deque, Tuple, Callable
+from dataclasses import dataclass, field
+from collections import defaultdict, deque
 import random
 
+import numpy as np
+
 from gaia.board.hexagons import Hexagon
 from gaia.board.sectors import Sector
 from gaia.board.federations import Federation
 from gaia.board.buildings import Building
-from gaia.utils.utils import CustomJSONSerialization
+from gaia.board.dense_board import DenseBoard
+from gaia.board.planet_distances import PlanetDistanceMatrix
+from gaia.board.map_serializer import MapSerializer
 from gaia.utils.enums import Factions, BuildingType
+from gaia.utils.zobrist import zobrist_key, BUILDINGS, PLANETS
 
 
 @dataclass(frozen=True)
 class Map(object):
     sectors: List[Sector]
     federations: List[Federation]
+    _hexagon_index: Dict[int, Hexagon] = field(init=False, repr=False, compare=False)
+    _sector_index: Dict[int, int] = field(init=False, repr=False, compare=False)
+    _faction_index: Dict[Factions, Dict[int, Hexagon]] = field(init=False, repr=False, compare=False)
+    _dense_board: Union[DenseBoard, None] = field(init=False, repr=False, compare=False)
+    _use_dense_board: bool = field(init=False, repr=False, compare=False)
+    _planet_distances: Union[PlanetDistanceMatrix, None] = field(init=False, repr=False, compare=False)
+    _version: int = field(init=False, repr=False, compare=False)
+    _changes: Deque[Tuple[int, dict]] = field(init=False, repr=False, compare=False)
+    _change_listeners: List[Callable[[dict], None]] = field(init=False, repr=False, compare=False)
+    _zobrist_hash: int = field(init=False, repr=False, compare=False)
+    _layout_hash: Union[int, None] = field(init=False, repr=False, compare=False)
 
-    def to_json(self):
-        class MapEncoder(json.JSONEncoder):
-            def default(self, obj):
-                if isinstance(obj, set):
-                    return list(obj)
-                elif isinstance(obj, CustomJSONSerialization):
-                    return obj.to_json()
-                else:
-                    return obj.__dict__
+    # Number of changes kept for changes_since, clients that are further behind need a full snapshot
+    MAX_CHANGE_LOG_LENGTH = 256
+
+    def __post_init__(self):
+        object.__setattr__(self, "_version", 0)
+        object.__setattr__(self, "_changes", deque(maxlen=self.MAX_CHANGE_LOG_LENGTH))
+        object.__setattr__(self, "_change_listeners", [])
+        object.__setattr__(self, "_dense_board", None)
+        object.__setattr__(self, "_use_dense_board", False)
+        object.__setattr__(self, "_planet_distances", None)
+        # XOR of the Zobrist keys of every building on the map, updated as buildings are indexed
+        object.__setattr__(self, "_zobrist_hash", 0)
+        object.__setattr__(self, "_layout_hash", None)
+        # Coordinate index over the hexagons of every sector, packed (x, z) key -> Hexagon,
+        # and packed (x, z) key -> position of the sector holding the hexagon in self.sectors
+        object.__setattr__(self, "_hexagon_index", dict())
+        object.__setattr__(self, "_sector_index", dict())
+        # Hexagons with a building on them, by the faction owning the building
+        object.__setattr__(self, "_faction_index", defaultdict(dict))
+        for sector_position, sector in enumerate(self.sectors):
+            self._index_sector_hexagons(sector_position, set(), sector.hexagons)
+            sector.add_change_listener(self._on_sector_changed)
+
+    def _on_sector_changed(self, sector: Sector, old_hexagons: Set[Hexagon], new_hexagons: Set[Hexagon]):
+        layout_changed = self._get_planet_layout(old_hexagons) != self._get_planet_layout(new_hexagons)
+        if layout_changed:
+            # The dense board, planet distances and layout hash have to be rebuilt when next needed
+            object.__setattr__(self, "_dense_board", None)
+            object.__setattr__(self, "_planet_distances", None)
+            object.__setattr__(self, "_layout_hash", None)
+
+        sector_position = self.sectors.index(sector)
+        self._index_sector_hexagons(sector_position, old_hexagons, new_hexagons)
+
+        if layout_changed:
+            self._record_change({
+                "type": "sector",
+                "index": sector_position,
+                "sector": sector.to_json()
+            })
+        else:
+            for hexagon in new_hexagons:
+                self._record_change({
+                    "type": "building",
+                    "x": hexagon.x,
+                    "z": hexagon.z,
+                    "building": hexagon.planet.building if hexagon.planet is not None else None
+                })
+
+    @property
+    def version(self) -> int:
+        """
+        Incremented every time anything on the map changes
+        """
+        return self._version
+
+    def _record_change(self, change: dict):
+        object.__setattr__(self, "_version", self._version + 1)
+        change["version"] = self._version
+        self._changes.append((self._version, change))
+        for listener in self._change_listeners:
+            listener(change)
+
+    def add_change_listener(self, listener: Callable[[dict], None]) -> None:
+        """
+        Registers a callback that is invoked with every change recorded in the change log (see changes_since)
+        """
+        self._change_listeners.append(listener)
+
+    def changes_since(self, version: int) -> Union[List[dict], None]:
+        """
+        The changes made to the map after the given version, oldest first.
+        None if the version is unknown, or too old for all of its changes to still be in the change log.
+        """
+        if version > self._version or version < 0:
+            return None
+        if version == self._version:
+            return []
+
+        oldest_version = self._changes[0][0] if self._changes else self._version + 1
+        if version < oldest_version - 1:
+            return None
+        return [change for change_version, change in self._changes if change_version > version]
+
+    def _index_sector_hexagons(self, sector_position: int, old_hexagons: Set[Hexagon], new_hexagons: Set[Hexagon]):
+        for hexagon in old_hexagons:
+            if self._hexagon_index.get(hexagon.key) is hexagon:
+                del self._hexagon_index[hexagon.key]
+                del self._sector_index[hexagon.key]
+                self._unindex_building(hexagon)
+        for hexagon in new_hexagons:
+            self._hexagon_index[hexagon.key] = hexagon
+            self._sector_index[hexagon.key] = sector_position
+            self._index_building(hexagon)
+
+    @staticmethod
+    def _get_planet_layout(hexagons: Set[Hexagon]) -> Set[tuple]:
+        return {(h.key, h.planet.planet_type if h.planet is not None else None) for h in hexagons}
+
+    def _index_building(self, hexagon: Hexagon):
+        if hexagon.planet is not None and hexagon.planet.building is not None:
+            self._faction_index[hexagon.planet.building.faction][hexagon.key] = hexagon
+            self._toggle_building_hash(hexagon)
+
+    def _unindex_building(self, hexagon: Hexagon):
+        if hexagon.planet is not None and hexagon.planet.building is not None:
+            self._faction_index[hexagon.planet.building.faction].pop(hexagon.key, None)
+            self._toggle_building_hash(hexagon)
+
+    def _toggle_building_hash(self, hexagon: Hexagon):
+        building = hexagon.planet.building
+        building_key = zobrist_key(BUILDINGS, hexagon.key, building.faction, building.building_type)
+        object.__setattr__(self, "_zobrist_hash", self._zobrist_hash ^ building_key)
+
+    @property
+    def zobrist_hash(self) -> int:
+        return self._zobrist_hash
+
+    @property
+    def layout_hash(self) -> int:
+        """
+        XOR of the Zobrist keys of the position and type of every planet on the map. Unlike zobrist_hash,
+        it only changes when sectors are moved or rotated, not when buildings are placed.
+        """
+        if self._layout_hash is None:
+            layout_hash = 0
+            for hexagon in self._hexagon_index.values():
+                if hexagon.planet is not None:
+                    layout_hash ^= zobrist_key(PLANETS, hexagon.key, hexagon.planet.planet_type)
+            object.__setattr__(self, "_layout_hash", layout_hash)
+        return self._layout_hash
+
+    def copy(self) -> Map:
+        """
+        Cheap copy of this map. Sectors are copied on write, and planets are never modified in place,
+        so the copy can be changed without affecting the original. The indexes are carried over as shallow
+        copies instead of being rebuilt from every hexagon.
+        """
+        sectors = [sector.copy() for sector in self.sectors]
+        map_copy = Map.__new__(Map)
+        for name, value in (("sectors", sectors),
+                            ("federations", list(self.federations)),
+                            ("_hexagon_index", dict(self._hexagon_index)),
+                            ("_sector_index", dict(self._sector_index)),
+                            ("_faction_index", defaultdict(dict, {faction: dict(hexagons) for faction, hexagons
+                                                                  in self._faction_index.items()})),
+                            ("_dense_board", None),
+                            ("_use_dense_board", self._use_dense_board),
+                            ("_planet_distances", self._planet_distances),
+                            ("_version", self._version),
+                            ("_changes", deque(self._changes, maxlen=self.MAX_CHANGE_LOG_LENGTH)),
+                            ("_change_listeners", []),
+                            ("_zobrist_hash", self._zobrist_hash),
+                            ("_layout_hash", self._layout_hash)):
+            object.__setattr__(map_copy, name, value)
+        for sector in sectors:
+            sector.add_change_listener(map_copy._on_sector_changed)
+        return map_copy
+
+    def get_planet_distances(self) -> PlanetDistanceMatrix:
+        """
+        Distances between every pair of planets on this map. Built on first use, shared with copies of this map,
+        and rebuilt after any sector is moved or rotated.
+        """
+        if self._planet_distances is None:
+            planet_hexagons = [h for h in self._hexagon_index.values() if h.planet is not None]
+            object.__setattr__(self, "_planet_distances", PlanetDistanceMatrix(planet_hexagons))
+        return self._planet_distances
+
+    def get_dense_board(self) -> DenseBoard:
+        """
+        Array-backed view of this map for vectorized queries. It is built on first use,
+        kept up to date by set_building, and rebuilt after any sector is moved or rotated.
+        """
+        if self._dense_board is None:
+            object.__setattr__(self, "_dense_board", DenseBoard(self.sectors))
+        return self._dense_board
+
+    def enable_dense_board(self, enabled: bool = True):
+        """
+        Answers range, distance and reachability queries from the dense board instead of walking hexagons.
+        Worth it for large boards with many buildings, i.e. in bulk simulations.
+        """
+        object.__setattr__(self, "_use_dense_board", enabled)
 
-        return json.dumps(self, cls=MapEncoder)
+    def _get_hexagons_at(self, xs: np.ndarray, zs: np.ndarray) -> List[Hexagon]:
+        index = self._hexagon_index
+        return [index[Hexagon.pack_coordinates(x, z)] for x, z in zip(xs.tolist(), zs.tolist())]
+
+    def to_json(self):
+        return MapSerializer.serialize(self.sectors, self.federations)
 
     def add_federation(self, federation: Federation):
         self.federations.append(federation)
+        self._record_change({
+            "type": "federation",
+            "federation": federation
+        })
 
     def get_hexagon(self, hexagon: Hexagon) -> Hexagon:
-        for sector in self.sectors:
-            sector_hexagon = sector.get_hexagon(hexagon)
-            if sector_hexagon is not None:
-                return sector_hexagon
+        return self._hexagon_index.get(hexagon.key)
 
     def get_hexagons_in_range(self, hexagon: Hexagon, distance: int, only_inhabited: bool = False) \
             -> Set[Hexagon]:
-        hexagons_in_range = hexagon.get_hexagons_in_range(distance)
+        if self._use_dense_board:
+            dense_board = self.get_dense_board()
+            mask = dense_board.in_range(hexagon.x, hexagon.z, distance)
+            if only_inhabited:
+                mask &= dense_board.occupied()
+            return set(self._get_hexagons_at(dense_board.x[mask], dense_board.z[mask]))
+
+        index = self._hexagon_index
         map_hexagons_in_range = set()
 
-        for hexagon in hexagons_in_range:
-            map_hexagon = self.get_hexagon(hexagon)
+        for key_offset in Hexagon.get_range_key_offsets(distance):
+            map_hexagon = index.get(hexagon.key + key_offset)
+            if map_hexagon is None:
+                continue
             if only_inhabited:
-                if map_hexagon is not None and map_hexagon.planet is not None and map_hexagon.planet.is_inhabited():
+                if map_hexagon.planet is not None and map_hexagon.planet.is_inhabited():
                     map_hexagons_in_range.add(map_hexagon)
             else:
                 map_hexagons_in_range.add(map_hexagon)
 
         return map_hexagons_in_range
 
+    def get_faction_hexagons(self, faction: Factions) -> Set[Hexagon]:
+        return set(self._faction_index[faction].values())
+
+    def faction_has_building_in_range(self, faction: Factions, hexagon: Hexagon, distance: int) -> bool:
+        """
+        Whether the faction has a building at most `distance` away from the hexagon.
+        Looks the distances up in the planet distance matrix if it has been built, otherwise
+        walks whichever is smaller: the faction's buildings, or the hexagons in range.
+        """
+        if self._use_dense_board:
+            return self.get_dense_board().faction_has_building_in_range(faction, hexagon.x, hexagon.z, distance)
+
+        faction_hexagons = self._faction_index[faction]
+        if self._planet_distances is not None and hexagon in self._planet_distances:
+            # Buildings are always on planets, so the distances can be looked up
+            return self._planet_distances.any_within(hexagon, faction_hexagons, distance)
+
+        key_offsets = Hexagon.get_range_key_offsets(distance)
+
+        if len(faction_hexagons) <= len(key_offsets):
+            return any(hexagon.distance(building_hexagon) <= distance
+                       for building_hexagon in faction_hexagons.values())
+        return any(hexagon.key + key_offset in faction_hexagons for key_offset in key_offsets)
+
+    def get_reachable_planets(self, faction: Factions, navigation_range: int, extra_range: int = 0) \
+            -> Dict[Hexagon, int]:
+        """
+        Finds every uninhabited planet within navigation_range + extra_range of one of the faction's buildings,
+        in a single sweep outwards from all of the faction's buildings at once.
+
+        Returns a mapping of each reachable planet's hexagon to the extra range (beyond navigation_range)
+        that is needed to reach it, i.e. 0 for planets that are reachable with the base navigation range.
+        """
+        if self._use_dense_board:
+            return self._get_reachable_planets_from_dense_board(faction, navigation_range, extra_range)
+
+        index = self._hexagon_index
+        building_keys = list(self._faction_index[faction])
+        reachable_planets = dict()
+        visited_keys = set()
+
+        for distance in range(navigation_range + extra_range + 1):
+            required_extra_range = max(distance - navigation_range, 0)
+            for key_offset in Hexagon.get_ring_key_offsets(distance):
+                for building_key in building_keys:
+                    key = building_key + key_offset
+                    if key in visited_keys:
+                        continue
+                    visited_keys.add(key)
+
+                    map_hexagon = index.get(key)
+                    if map_hexagon is not None and map_hexagon.planet is not None \
+                            and not map_hexagon.planet.is_inhabited():
+                        reachable_planets[map_hexagon] = required_extra_range
+
+        return reachable_planets
+
+    def _get_reachable_planets_from_dense_board(self, faction: Factions, navigation_range: int, extra_range: int) \
+            -> Dict[Hexagon, int]:
+        dense_board = self.get_dense_board()
+        distances = dense_board.get_distance_to_faction(faction)
+        mask = (dense_board.has_planet & ~dense_board.occupied() &
+                (distances != dense_board.NONE) & (distances <= navigation_range + extra_range))
+
+        required_extra_ranges = np.maximum(distances[mask] - navigation_range, 0).tolist()
+        return dict(zip(self._get_hexagons_at(dense_board.x[mask], dense_board.z[mask]), required_extra_ranges))
+
     def inhabit_planet(self, hexagon: Hexagon, building: Building) -> bool:
-        for sector in self.sectors:
-            map_hexagon = sector.get_hexagon(hexagon)
-            if map_hexagon is not None and map_hexagon.planet is not None:
-                map_hexagon.planet.building = building
-                return True
-        return False
+        return self.set_building(hexagon, building)
+
+    def set_building(self, hexagon: Hexagon, building: Union[Building, None]) -> bool:
+        """
+        Places the building on the planet at the hexagon, replacing any building already there,
+        or removes the building from the planet if building is None
+        """
+        map_hexagon = self.get_hexagon(hexagon)
+        if map_hexagon is None or map_hexagon.planet is None:
+            return False
+
+        # Planets can be shared with copies of this map, so the hexagon is replaced rather than modified
+        inhabited_hexagon = Hexagon(map_hexagon.x, map_hexagon.z, map_hexagon.planet.get_inhabited_copy(building))
+        self.sectors[self._sector_index[map_hexagon.key]].replace_hexagon(inhabited_hexagon)
+        if self._dense_board is not None:
+            self._dense_board.set_building(map_hexagon.x, map_hexagon.z, building)
+        return True
 
     def add_buildings_to_all_planets(self):
         for sector in self.sectors:
-            for hexagon in sector.hexagons:
+            for hexagon in list(sector.hexagons):
                 self.inhabit_planet(hexagon, Building(random.choice(list(Factions)), random.choice(list(BuildingType))))
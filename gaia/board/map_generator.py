@@ -0,0 +1,166 @@
+from __future__ import annotations
+from typing import Dict, Tuple, Union
+from collections import namedtuple
+
+import numpy as np
+
+from gaia.utils.enums import PlanetType
+from gaia.board.map import Map
+
+# A batch of candidate layouts. Each array has one row per layout and one column per slot on the board.
+Layouts = namedtuple("Layouts", ["tiles", "sides", "rotations"])
+
+# Planet types that players can live on without gaiaforming
+COLORED_PLANET_TYPES = [planet_type for planet_type in PlanetType if planet_type <= PlanetType.BLUE]
+
+
+class MapGenerator(object):
+    """
+    Generates random layouts by shuffling GameTiles between the slots of a configured layout,
+    and rotating (and optionally flipping) each of them.
+
+    Layouts are generated and scored in batches as arrays, and only turned into Maps on request.
+    A lower balance score is better.
+    """
+    SAME_COLOR_ADJACENCY_WEIGHT = 1.0
+    SECTOR_DUPLICATE_COLOR_WEIGHT = 1.0
+
+    # Directions that cover every pair of neighbouring hexagons exactly once
+    _NEIGHBOUR_DIRECTIONS = ((1, 0), (0, 1), (1, -1))
+
+    def __init__(self, all_game_tiles: Dict, game_type_config: dict, random_sides: bool = False,
+                 seed: Union[int, None] = None):
+        self.all_game_tiles = all_game_tiles
+        self.random_sides = random_sides
+        self._random = np.random.RandomState(seed)
+
+        slot_configs = game_type_config["tiles"]
+        self.tile_numbers = np.array([slot["number"] for slot in slot_configs])
+        self.default_sides = np.array([slot["side"] for slot in slot_configs])
+        self.slots = np.array([(slot["x_offset"], slot["z_offset"]) for slot in slot_configs])
+        self.num_sides = np.array([len(all_game_tiles[number].sides) for number in self.tile_numbers])
+
+        self._build_variant_tables()
+
+    def seed(self, seed: Union[int, None]) -> None:
+        self._random.seed(seed)
+
+    def _build_variant_tables(self):
+        """
+        Lays out the planets of every (tile, side, rotation) as padded arrays, so a batch of layouts
+        can be placed on a grid with one fancy-indexing operation
+        """
+        variants = [
+            [[sorted(variant, key=lambda h: h.key) for variant in side.get_rotation_variants()]
+             for side in self.all_game_tiles[number].sides]
+            for number in self.tile_numbers
+        ]
+        max_planets = max(len([h for h in v if h.planet]) for tile in variants for side in tile for v in side)
+        max_sides = max(self.num_sides)
+        radius = max(side.radius for number in self.tile_numbers for side in self.all_game_tiles[number].sides)
+
+        # (tile index, side, rotation, planet) -> x offset, z offset, planet type (0 for padding)
+        shape = (len(self.tile_numbers), max_sides, 6, max_planets)
+        self._planet_x = np.zeros(shape, dtype=np.int16)
+        self._planet_z = np.zeros(shape, dtype=np.int16)
+        self._planet_types = np.zeros(shape, dtype=np.int8)
+
+        for tile_index, tile in enumerate(variants):
+            for side_index, side in enumerate(tile):
+                for rotation, variant in enumerate(side):
+                    planets = [h for h in variant if h.planet is not None]
+                    for planet_index, hexagon in enumerate(planets):
+                        self._planet_x[tile_index, side_index, rotation, planet_index] = hexagon.x
+                        self._planet_z[tile_index, side_index, rotation, planet_index] = hexagon.z
+                        self._planet_types[tile_index, side_index, rotation, planet_index] = hexagon.planet.planet_type
+
+        # Grid covering every slot, with a margin of one hexagon so neighbour lookups never wrap around
+        self._min_x = self.slots[:, 0].min() - radius - 1
+        self._min_z = self.slots[:, 1].min() - radius - 1
+        self._grid_shape = (self.slots[:, 0].max() + radius + 2 - self._min_x,
+                            self.slots[:, 1].max() + radius + 2 - self._min_z)
+
+    def random_layouts(self, num_layouts: int, random_state: Union[np.random.RandomState, None] = None) -> Layouts:
+        """
+        Draws the layouts from random_state if given, otherwise from this generator's own random state.
+        Generators are shared (i.e. cached by MapLoader), so concurrent callers should pass their own random state.
+        """
+        random = self._random if random_state is None else random_state
+        num_slots = len(self.slots)
+        tiles = np.argsort(random.rand(num_layouts, num_slots), axis=1)
+        if self.random_sides:
+            sides = (random.rand(num_layouts, num_slots) * self.num_sides[tiles]).astype(np.int64)
+        else:
+            sides = self.default_sides[tiles]
+        rotations = random.randint(0, 6, size=(num_layouts, num_slots))
+        return Layouts(tiles, sides, rotations)
+
+    def place_planets(self, layouts: Layouts) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns the planet types of each layout on a (layouts, x, z) grid (0 where there is no planet),
+        and the (layouts, slots, planets) planet types of each sector
+        """
+        sector_planet_types = self._planet_types[layouts.tiles, layouts.sides, layouts.rotations]
+        xs = self._planet_x[layouts.tiles, layouts.sides, layouts.rotations] + \
+            (self.slots[:, 0] - self._min_x)[np.newaxis, :, np.newaxis]
+        zs = self._planet_z[layouts.tiles, layouts.sides, layouts.rotations] + \
+            (self.slots[:, 1] - self._min_z)[np.newaxis, :, np.newaxis]
+
+        # Padding entries (planet type 0) are written to the cell at the origin, which is always empty
+        is_planet = sector_planet_types != 0
+        xs, zs = np.where(is_planet, xs, 0), np.where(is_planet, zs, 0)
+
+        num_layouts = len(layouts.tiles)
+        grid = np.zeros((num_layouts,) + self._grid_shape, dtype=np.int8)
+        layout_indices = np.broadcast_to(np.arange(num_layouts)[:, np.newaxis, np.newaxis], xs.shape)
+        grid[layout_indices, xs, zs] = sector_planet_types
+        return grid, sector_planet_types
+
+    def score_layouts(self, layouts: Layouts) -> np.ndarray:
+        grid, sector_planet_types = self.place_planets(layouts)
+
+        colored = (grid >= COLORED_PLANET_TYPES[0]) & (grid <= COLORED_PLANET_TYPES[-1])
+        same_color_adjacencies = np.zeros(len(grid), dtype=np.int64)
+        for dx, dz in self._NEIGHBOUR_DIRECTIONS:
+            shifted = np.roll(np.roll(grid, -dx, axis=1), -dz, axis=2)
+            same_color_adjacencies += ((grid == shifted) & colored).sum(axis=(1, 2))
+
+        color_counts = np.stack([(sector_planet_types == planet_type).sum(axis=2)
+                                 for planet_type in COLORED_PLANET_TYPES], axis=2)
+        sector_duplicate_colors = np.maximum(color_counts - 1, 0).sum(axis=(1, 2))
+
+        return self.SAME_COLOR_ADJACENCY_WEIGHT * same_color_adjacencies + \
+            self.SECTOR_DUPLICATE_COLOR_WEIGHT * sector_duplicate_colors
+
+    def generate_balanced_layouts(self, num_layouts: int, max_score: float, batch_size: int = 1000,
+                                  max_batches: int = 100,
+                                  random_state: Union[np.random.RandomState, None] = None) -> Layouts:
+        """
+        Generates batches of random layouts, keeping those with a balance score of at most max_score.
+        Returns fewer than num_layouts layouts if max_batches batches did not produce enough of them.
+        """
+        kept = []
+        num_kept = 0
+        for i in range(max_batches):
+            layouts = self.random_layouts(batch_size, random_state)
+            balanced = self.score_layouts(layouts) <= max_score
+            kept.append(Layouts(*(array[balanced] for array in layouts)))
+            num_kept += balanced.sum()
+            if num_kept >= num_layouts:
+                break
+
+        return Layouts(*(np.concatenate(arrays)[:num_layouts] for arrays in zip(*kept)))
+
+    def to_map(self, layouts: Layouts, index: int = 0) -> Map:
+        sectors = []
+        for slot, (tile, side, rotation) in enumerate(zip(layouts.tiles[index], layouts.sides[index],
+                                                          layouts.rotations[index])):
+            sector = self.all_game_tiles[self.tile_numbers[tile]][side].copy()
+            sector.rotate(int(rotation) * 60)
+            sector.adjust_offset(int(self.slots[slot][0]), int(self.slots[slot][1]))
+            sectors.append(sector)
+
+        return Map(sectors, [])
+
+    def generate(self, random_state: Union[np.random.RandomState, None] = None) -> Map:
+        return self.to_map(self.random_layouts(1, random_state))
@@ -1,6 +1,9 @@
 from __future__ import annotations
-from typing import Dict
+from typing import Dict, Tuple
 import json
+import os
+
+import numpy as np
 
 from gaia.utils.enums import PlanetType
 
@@ -8,6 +11,8 @@ from gaia.board.sectors import Sector
 from gaia.board.hexagons import Hexagon
 from gaia.board.planets import Planet
 from gaia.board.map import Map
+from gaia.board.compiled_layouts import CompiledLayouts, compile_layouts
+from gaia.board.map_generator import MapGenerator
 
 
 class GameTile(object):
@@ -26,6 +31,10 @@ class GameTile(object):
         with open(config_path) as config:
             config = json.load(config)
 
+        return GameTile.get_tile_mapping(config)
+
+    @staticmethod
+    def get_tile_mapping(config: dict) -> Dict[int, GameTile]:
         tile_mapping = dict()
 
         for tile in config["tiles"]:
@@ -35,28 +44,119 @@ class GameTile(object):
             radius = tile["radius"]
             for side in tile["sides"]:
                 hexagons = {Hexagon(p["x"], p["z"], Planet(PlanetType[p["type"]])) for p in side}
-                game_tile.sides.append(Sector(hexagons, radius))
+                sector = Sector(hexagons, radius)
+                # Done up front so that every copy of the sector shares the same rotations
+                sector.get_rotation_variants()
+                game_tile.sides.append(sector)
 
         return tile_mapping
 
 
 class MapLoader(object):
+    # Parsed configs and their tile mappings, keyed by (config path, config modification time)
+    _config_cache = dict()  # type: Dict[Tuple[str, int], Tuple[dict, Dict[int, GameTile]]]
+    # Fully placed maps, keyed by (config path, config modification time, game type).
+    # These are never handed out directly, callers get copies of them.
+    _layout_cache = dict()  # type: Dict[Tuple[str, int, str], Map]
+    # Random map generators, keyed by (config path, config modification time)
+    _generator_cache = dict()  # type: Dict[Tuple[str, int], MapGenerator]
+
+    # The game type whose tiles and slots are shuffled when no game type is given
+    RANDOM_MAP_GAME_TYPE = "3p_4p_default"
+
+    @staticmethod
+    def load_from_config(config_path: str, game_type: str = None, seed: int = None) -> Map:
+        """
+        Loads the layout of the given game type. If no game type is given, a random layout
+        is generated from the tiles of RANDOM_MAP_GAME_TYPE, optionally seeded.
+        """
+        config_key = (os.path.realpath(config_path), os.stat(config_path).st_mtime_ns)
+
+        if game_type:
+            layout_key = config_key + (game_type,)
+            layout = MapLoader._layout_cache.get(layout_key)
+            if layout is None:
+                config, all_game_tiles = MapLoader._load_config(config_key)
+                layout = MapLoader._layout_cache[layout_key] = MapLoader._place_tiles(config[game_type],
+                                                                                      all_game_tiles)
+            return layout.copy()
+        else:
+            # The generator is shared, so it is not reseeded; each call draws from its own random state
+            return MapLoader.get_map_generator(config_path).generate(np.random.RandomState(seed))
+
     @staticmethod
-    def load_from_config(config_path: str, game_type: str = None) -> Map:
+    def get_map_generator(config_path: str) -> MapGenerator:
+        config_key = (os.path.realpath(config_path), os.stat(config_path).st_mtime_ns)
+
+        generator = MapLoader._generator_cache.get(config_key)
+        if generator is None:
+            config, all_game_tiles = MapLoader._load_config(config_key)
+            generator = MapLoader._generator_cache[config_key] = \
+                MapGenerator(all_game_tiles, config[MapLoader.RANDOM_MAP_GAME_TYPE])
+        return generator
+
+    @staticmethod
+    def compile_config(config_path: str, compiled_path: str) -> None:
+        """
+        Places every game type in the config and writes them to a compiled layouts file,
+        which can be loaded with load_from_compiled without parsing any JSON
+        """
         with open(config_path) as config:
             config = json.load(config)
 
-        all_game_tiles = GameTile.get_tile_mapping_from_config(config_path)
+        all_game_tiles = GameTile.get_tile_mapping(config)
+        layouts = {
+            game_type: MapLoader._place_tiles(game_type_config, all_game_tiles)
+            for game_type, game_type_config in config.items() if game_type != "tiles"
+        }
+
+        with open(compiled_path, "wb") as compiled:
+            compiled.write(compile_layouts(layouts))
+
+    @staticmethod
+    def load_from_compiled(compiled_path: str, game_type: str) -> Map:
+        layout_key = (os.path.realpath(compiled_path), os.stat(compiled_path).st_mtime_ns, game_type)
+
+        layout = MapLoader._layout_cache.get(layout_key)
+        if layout is None:
+            layout = MapLoader._layout_cache[layout_key] = CompiledLayouts(compiled_path)[game_type].to_map()
+            layout.get_planet_distances()
+        return layout.copy()
+
+    @staticmethod
+    def clear_cache() -> None:
+        MapLoader._config_cache.clear()
+        MapLoader._layout_cache.clear()
+        MapLoader._generator_cache.clear()
+
+    @staticmethod
+    def _load_config(config_key: Tuple[str, int]) -> Tuple[dict, Dict[int, GameTile]]:
+        if config_key not in MapLoader._config_cache:
+            # Entries for older versions of the config file will never be used again
+            for key in [key for key in MapLoader._config_cache if key[0] == config_key[0]]:
+                del MapLoader._config_cache[key]
+            for key in [key for key in MapLoader._layout_cache if key[0] == config_key[0]]:
+                del MapLoader._layout_cache[key]
+            for key in [key for key in MapLoader._generator_cache if key[0] == config_key[0]]:
+                del MapLoader._generator_cache[key]
+
+            with open(config_key[0]) as config:
+                config = json.load(config)
+            MapLoader._config_cache[config_key] = config, GameTile.get_tile_mapping(config)
+
+        return MapLoader._config_cache[config_key]
+
+    @staticmethod
+    def _place_tiles(game_type_config: dict, all_game_tiles: Dict[int, GameTile]) -> Map:
         sectors = []
 
-        if game_type:
-            for tile_config in config[game_type]["tiles"]:
-                tile = all_game_tiles[tile_config["number"]]
-                sector = tile[tile_config["side"]]
-                sector.adjust_offset(tile_config["x_offset"], tile_config["z_offset"])
-                sectors.append(sector)
-        else:
-            # TODO implement random map generation
-            raise NotImplementedError
+        for tile_config in game_type_config["tiles"]:
+            tile = all_game_tiles[tile_config["number"]]
+            sector = tile[tile_config["side"]].copy()
+            sector.adjust_offset(tile_config["x_offset"], tile_config["z_offset"])
+            sectors.append(sector)
 
-        return Map(sectors, [])
+        game_map = Map(sectors, [])
+        # Built once here, and shared by every game played on this layout
+        game_map.get_planet_distances()
+        return game_map
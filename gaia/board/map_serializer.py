@@ -0,0 +1,86 @@
+from __future__ import annotations
+from typing import Union
+import json
+
+from gaia.board.hexagons import Hexagon
+from gaia.board.planets import Planet
+from gaia.board.sectors import Sector
+from gaia.utils.utils import CustomJSONSerialization
+from gaia.utils.lru_cache import LRUCache
+
+
+class JSONEncoder(json.JSONEncoder):
+    def default(self, obj):
+        if isinstance(obj, set):
+            return list(obj)
+        elif isinstance(obj, CustomJSONSerialization):
+            return obj.to_json()
+        else:
+            return obj.__dict__
+
+
+class MapSerializer(object):
+    """
+    Serializes maps to JSON by splicing together pre-encoded fragments.
+
+    Everything that only depends on the layout (coordinates, screen factors, sector headers) is encoded once
+    and cached. Planets only have a handful of possible states (planet type, and faction/building type
+    of the building on them), so their encodings are cached as well.
+    The output is the same as json.dumps with the to_json methods of the board objects.
+    """
+    # Bounded, as the caches are shared by every map and random layouts keep producing new coordinates
+    _hexagon_fragments = LRUCache(max_size=4096)  # hexagon key -> fragment
+    _sector_fragments = LRUCache(max_size=256)  # (radius, x offset, z offset) -> fragment
+    _planet_fragments = LRUCache(max_size=1024)  # (planet type, building type, faction, building type) -> fragment
+
+    @classmethod
+    def serialize(cls, sectors, federations) -> str:
+        sectors_json = ", ".join(cls._serialize_sector(sector) for sector in sectors)
+        federations_json = json.dumps(federations, cls=JSONEncoder)
+        return '{"sectors": [' + sectors_json + '], "federations": ' + federations_json + '}'
+
+    @classmethod
+    def _serialize_sector(cls, sector: Sector) -> str:
+        sector_key = (sector.radius, sector.x_offset, sector.z_offset)
+        fragment = cls._sector_fragments.get(sector_key)
+        if fragment is None:
+            center = Hexagon(sector.x_offset, sector.z_offset)
+            fragment = json.dumps({
+                "radius": sector.radius,
+                "x_offset": sector.x_offset,
+                "z_offset": sector.z_offset,
+                "screen_x_factor": center.screen_x_factor,
+                "screen_y_factor": center.screen_y_factor
+            })[:-1] + ', "hexagons": ['
+            cls._sector_fragments.put(sector_key, fragment)
+
+        return fragment + ", ".join(cls._serialize_hexagon(hexagon) for hexagon in sector.hexagons) + ']}'
+
+    @classmethod
+    def _serialize_hexagon(cls, hexagon: Hexagon) -> str:
+        fragment = cls._hexagon_fragments.get(hexagon.key)
+        if fragment is None:
+            fragment = json.dumps({
+                "x": hexagon.x,
+                "z": hexagon.z,
+                "screen_x_factor": hexagon.screen_x_factor,
+                "screen_y_factor": hexagon.screen_y_factor
+            })[:-1] + ', "planet": '
+            cls._hexagon_fragments.put(hexagon.key, fragment)
+
+        return fragment + cls._serialize_planet(hexagon.planet) + '}'
+
+    @classmethod
+    def _serialize_planet(cls, planet: Union[Planet, None]) -> str:
+        if planet is None:
+            return 'null'
+
+        building = planet.building
+        planet_key = (planet.planet_type, type(building)) if building is None else \
+            (planet.planet_type, type(building), building.faction, building.building_type)
+
+        fragment = cls._planet_fragments.get(planet_key)
+        if fragment is None:
+            fragment = json.dumps(planet, cls=JSONEncoder)
+            cls._planet_fragments.put(planet_key, fragment)
+        return fragment
@@ -0,0 +1,38 @@
+from __future__ import annotations
+from typing import Iterable, List
+
+import numpy as np
+
+from gaia.board.hexagons import Hexagon
+
+
+class PlanetDistanceMatrix(object):
+    """
+    Hex distances between every pair of planets of a layout, indexed by planet id.
+    Planet ids are assigned in order of the planets' hexagon keys.
+
+    The matrix only depends on where the planets are, so it is shared by every game on the same layout.
+    """
+    def __init__(self, planet_hexagons: Iterable[Hexagon]):
+        self.planet_hexagons = sorted(planet_hexagons, key=lambda h: h.key)  # type: List[Hexagon]
+        self.planet_ids = {hexagon.key: planet_id for planet_id, hexagon in enumerate(self.planet_hexagons)}
+
+        xs = np.array([hexagon.x for hexagon in self.planet_hexagons], dtype=np.int16)
+        zs = np.array([hexagon.z for hexagon in self.planet_hexagons], dtype=np.int16)
+        dx = xs[:, np.newaxis] - xs[np.newaxis, :]
+        dz = zs[:, np.newaxis] - zs[np.newaxis, :]
+        self.distances = ((np.abs(dx) + np.abs(dz) + np.abs(dx + dz)) // 2).astype(np.int8)
+        self.distances.flags.writeable = False
+
+    def __contains__(self, hexagon: Hexagon) -> bool:
+        return hexagon.key in self.planet_ids
+
+    def distance(self, hexagon: Hexagon, other: Hexagon) -> int:
+        return int(self.distances[self.planet_ids[hexagon.key], self.planet_ids[other.key]])
+
+    def any_within(self, hexagon: Hexagon, other_keys: Iterable[int], distance: int) -> bool:
+        """
+        Whether any of the planets with the given hexagon keys is at most `distance` away from the hexagon
+        """
+        other_ids = [self.planet_ids[key] for key in other_keys]
+        return len(other_ids) > 0 and bool(self.distances[self.planet_ids[hexagon.key], other_ids].min() <= distance)
@@ -1,8 +1,9 @@
 from __future__ import annotations
-from typing import Set
+from typing import Set, Callable, Tuple, FrozenSet, AbstractSet
+from copy import copy
 import random
 
-from gaia.utils.utils import CustomJSONSerialization, obj_to_json
+from gaia.utils.utils import CustomJSONSerialization
 from gaia.board.hexagons import Hexagon
 
 
@@ -13,6 +14,7 @@ class Sector(CustomJSONSerialization):
         self.radius = radius
         self.x_offset = x_offset
         self.z_offset = z_offset
+        self._change_listeners = []
 
         planet_hexagons = {
             Hexagon(x=planet_hex.x + self.x_offset,
@@ -22,39 +24,115 @@ class Sector(CustomJSONSerialization):
         }
 
         center = Hexagon(self.x_offset, self.z_offset)
-        self.hexagons = self.create_sector_hexagons(center, planet_hexagons)
+        self._hexagons = self.create_sector_hexagons(center, planet_hexagons)
+        self._hexagon_index = {h.key: h for h in self._hexagons}
+        self._hexagons_shared = False
+        # Rotation (in 60 degree steps) of the current hexagons relative to the first rotation variant
+        self.rotation = 0
+        self._rotation_variants = None
 
-    def create_sector_hexagons(self, central_hexagon: Hexagon, planet_hexagons: Set[Hexagon]) -> Set[Hexagon]:
-        sector_hexagons = central_hexagon.get_hexagons_in_range(self.radius) - planet_hexagons
+    def copy(self) -> Sector:
+        """
+        Cheap copy of this sector. The hexagons are shared between the copies until one of them replaces a hexagon.
+        Change listeners are not carried over to the copy.
+        """
+        sector_copy = copy(self)
+        sector_copy._change_listeners = []
+        sector_copy._hexagons_shared = self._hexagons_shared = True
+        return sector_copy
+
+    @property
+    def hexagons(self) -> Set[Hexagon]:
+        return self._hexagons
+
+    @hexagons.setter
+    def hexagons(self, hexagons: Set[Hexagon]) -> None:
+        old_hexagons, self._hexagons = self._hexagons, hexagons
+        self._hexagon_index = {h.key: h for h in hexagons}
+        self._hexagons_shared = False
+        self._notify_change_listeners(old_hexagons, hexagons)
+
+    def replace_hexagon(self, hexagon: Hexagon) -> None:
+        """
+        Replaces the hexagon at the same coordinates as the given one (i.e. with one holding an inhabited planet)
+        """
+        old_hexagon = self._hexagon_index[hexagon.key]
+        if self._hexagons_shared:
+            self._hexagons, self._hexagon_index = set(self._hexagons), dict(self._hexagon_index)
+            self._hexagons_shared = False
+
+        self._hexagons.discard(old_hexagon)
+        self._hexagons.add(hexagon)
+        self._hexagon_index[hexagon.key] = hexagon
+        # The precomputed rotations no longer match the hexagons of this sector
+        self._rotation_variants, self.rotation = None, 0
+        self._notify_change_listeners({old_hexagon}, {hexagon})
+
+    def _notify_change_listeners(self, old_hexagons: Set[Hexagon], new_hexagons: Set[Hexagon]) -> None:
+        for listener in self._change_listeners:
+            listener(self, old_hexagons, new_hexagons)
 
-        sector_hexagons.update(planet_hexagons)
+    def add_change_listener(self, listener: Callable[[Sector, Set[Hexagon], Set[Hexagon]], None]) -> None:
+        """
+        Registers a callback that is invoked with (sector, old_hexagons, new_hexagons)
+        whenever hexagons of this sector are replaced (i.e. after a rotation, offset adjustment or replace_hexagon)
+        """
+        self._change_listeners.append(listener)
+
+    def create_sector_hexagons(self, central_hexagon: Hexagon, planet_hexagons: Set[Hexagon]) -> Set[Hexagon]:
+        sector_hexagons = set(planet_hexagons)
+        sector_hexagons.update(central_hexagon.spiral(self.radius))
         return sector_hexagons
 
+    def get_rotation_variants(self) -> Tuple[FrozenSet[Hexagon], ...]:
+        """
+        The hexagons of this sector in each of its six rotations, indexed by rotation (see Sector.rotation)
+        and relative to the center of the sector. Computed once, and shared with copies of this sector.
+        """
+        if self._rotation_variants is None:
+            variant = frozenset(h.adjust_offset(-self.x_offset, -self.z_offset) for h in self._hexagons)
+            variants = [variant]
+            for i in range(5):
+                variant = frozenset(h.rotate(60) for h in variant)
+                variants.append(variant)
+
+            self._rotation_variants = tuple(variants[-self.rotation:] + variants[:-self.rotation])
+        return self._rotation_variants
+
     def rotate(self, degrees: int) -> None:
-        self.hexagons = {hexagon.rotate(degrees) for hexagon in self.hexagons}
+        """
+        Rotates the sector clockwise around its center
+        """
+        assert degrees % 60 == 0
+        rotation = (self.rotation + degrees // 60) % 6
+        variant = self.get_rotation_variants()[rotation]
+
+        self.rotation = rotation
+        self.hexagons = self._translate(variant, self.x_offset, self.z_offset)
 
     def random_rotate(self) -> None:
-        self.rotate(random.randint(0, 6) * 60)
+        self.rotate(random.randint(0, 5) * 60)
 
     def adjust_offset(self, x_offset: int, z_offset: int) -> None:
         x_offset_diff = x_offset - self.x_offset
         z_offset_diff = z_offset - self.z_offset
 
         self.x_offset, self.z_offset = x_offset, z_offset
-        new_hexagons = set()
-        for old_hex in self.hexagons:
-            new_hex = old_hex.adjust_offset(x_offset_diff, z_offset_diff)
-            new_hexagons.add(new_hex)
+        self.hexagons = self._translate(self.hexagons, x_offset_diff, z_offset_diff)
 
-        self.hexagons = new_hexagons
+    @staticmethod
+    def _translate(hexagons: AbstractSet[Hexagon], x_offset_diff: int, z_offset_diff: int) -> Set[Hexagon]:
+        return {Hexagon(h.x + x_offset_diff, h.z + z_offset_diff, h.planet) for h in hexagons}
 
     def to_json(self):
-        return obj_to_json(self, {
+        return {
+            "radius": self.radius,
+            "x_offset": self.x_offset,
+            "z_offset": self.z_offset,
             "screen_x_factor": Hexagon(self.x_offset, self.z_offset).screen_x_factor,
             "screen_y_factor": Hexagon(self.x_offset, self.z_offset).screen_y_factor,
             "hexagons": list(self.hexagons)
-        })
+        }
 
     def get_hexagon(self, hexagon: Hexagon) -> Hexagon:
-        sector_hexagon = [h for h in self.hexagons if h == hexagon]
-        return sector_hexagon[0] if len(sector_hexagon) == 1 else None
+        return self._hexagon_index.get(hexagon.key)
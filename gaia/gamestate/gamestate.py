@@ -1,11 +1,19 @@
 from __future__ import annotations
 from dataclasses import dataclass
-from typing import Dict, Tuple
+from typing import Dict, List, Tuple
+
+import numpy as np
 
 from gaia.gamestate.players import Player, Income
+from gaia.gamestate.income import apply_income_phase
 from gaia.turns.bonuses import AvailableRoundBonuses
+from gaia.turns.action_types import Action
+from gaia.turns.deltas import Delta
 from gaia.board.map import Map
+from gaia.board.hexagons import Hexagon
 from gaia.utils.enums import ResearchTracks
+from gaia.utils.transposition_cache import TranspositionCache
+from gaia.utils.zobrist import zobrist_key, RESEARCH_PLACEMENTS, AVAILABLE_ROUND_BONUSES
 
 
 @dataclass
@@ -16,12 +24,78 @@ class GameState(object):
     scoring_board: ScoringBoard
     round_bonuses: AvailableRoundBonuses
     
+    def copy(self) -> GameState:
+        """
+        Copy of this game state that shares all structure an action cannot change in place.
+        The map is copied on write (see Map.copy), and each player gets its own resources. Hexagons and planets
+        are shared, but the map's coordinate indexes are still copied, so a copy takes time linear in the number
+        of hexagons.
+        The research board, scoring board and round bonuses are shared with the copy.
+        """
+        return GameState({player_id: player.copy() for player_id, player in self.players.items()},
+                         self.game_map.copy(),
+                         self.research_board,
+                         self.scoring_board,
+                         self.round_bonuses)
+
+    def apply_action(self, action: Action, player_id: str) -> GameState:
+        """
+        Performs the action on a copy of this game state and returns the copy, leaving this game state unchanged
+        """
+        next_gamestate = self.copy()
+        action.perform_action(next_gamestate, player_id)
+        return next_gamestate
+
+    @property
+    def zobrist_hash(self) -> int:
+        """
+        64 bit hash of the buildings on the map, the research placements, the resources and round bonuses of
+        the players, and the round bonuses still available. Equal game states have equal hashes.
+        """
+        zobrist_hash = self.game_map.zobrist_hash ^ self.research_board.zobrist_hash
+        for player in self.players.values():
+            zobrist_hash ^= player.zobrist_hash()
+        for bonus_id in self.round_bonuses.round_bonuses:
+            zobrist_hash ^= zobrist_key(AVAILABLE_ROUND_BONUSES, bonus_id)
+        return zobrist_hash
+
+    def apply(self, delta: Delta):
+        delta.apply(self)
+
+    def undo(self, delta: Delta):
+        """
+        Reverts a delta, which must be the last delta applied to this game state that has not been undone yet
+        """
+        delta.undo(self)
+
+    def apply_income_phase(self):
+        """
+        Gives every player their income for the round, see gaia.gamestate.income
+        """
+        apply_income_phase([self])
+
     def add_player(self, player: Player):
         self.players[player.player_id] = player
 
     def get_player(self, player_id: str):
         return self.players.get(player_id)
 
+    def get_reachable_planets(self, player_id: str, extra_range: int = 0,
+                              cache: TranspositionCache = None) -> Dict[Hexagon, int]:
+        """
+        All uninhabited planets the player can reach with their research navigation plus up to extra_range
+        (i.e. from QIC boosts), mapped to the extra range needed to reach each of them.
+        Results are memoized in the cache if one is given.
+        """
+        def get_reachable_planets():
+            player = self.players[player_id]
+            navigation_range = self.research_board.get_player_navigation_ability(player)
+            return self.game_map.get_reachable_planets(player.faction, navigation_range, extra_range)
+
+        if cache is None:
+            return get_reachable_planets()
+        return dict(cache.get_or_compute(self, ("reachable_planets", player_id, extra_range), get_reachable_planets))
+
 
 class ScoringBoard(object):
     pass
@@ -33,63 +107,104 @@ class ResearchBoard(object):
 
     The board can be queried for permanent player attributes. However, one-time bonuses will not be stored,
     and will be applied to the relevant player object when the bonus is granted.
+
+    Players are numbered in the order they are first placed, and their levels are stored in a
+    (players x tracks) array, so the bonuses of every player can be looked up at once in the level-indexed tables.
     """
+    MAX_LEVEL = 5
+
+    GAIAFORMING_COSTS = np.array([3, 3, 2, 1, 1, 1])
+    NAVIGATION_ABILITIES = np.array([1, 1, 2, 2, 3, 4])
+    GAIAFORMERS_AND_COSTS = np.array([(0, 0), (1, 6), (1, 6), (2, 4), (3, 3), (3, 3)])
+    ECONOMY_BONUSES = np.array([
+        Income().to_tuple(),
+        Income(credits=2, power=1).to_tuple(),
+        Income(ore=1, credits=2, power=2).to_tuple(),
+        Income(ore=1, credits=3, power=3).to_tuple(),
+        Income(ore=2, credits=4, power=4).to_tuple(),
+        Income().to_tuple()
+    ])
+    SCIENCE_BONUSES = np.array([0, 1, 2, 3, 4, 0])
+
     def __init__(self):
-        self.player_placements = {
-            track: dict() for track in ResearchTracks
-        }
+        self.players = []  # type: List[Player]
+        self._player_indices = dict()  # type: Dict[Player, int]
+        self.placements = np.zeros((0, len(ResearchTracks)), dtype=np.int8)
+        # XOR of the Zobrist keys of every placement above level 0, updated as players are placed
+        self.zobrist_hash = 0
+
+    def _get_player_index(self, player: Player) -> int:
+        if player not in self._player_indices:
+            self._player_indices[player] = len(self.players)
+            self.players.append(player)
+            self.placements = np.vstack([self.placements, np.zeros(len(ResearchTracks), dtype=np.int8)])
+        return self._player_indices[player]
 
     def place_player(self, player: Player, track: ResearchTracks, level: int = 0):
-        self.player_placements[track][player] = level
-
-    def get_placement(self, player: Player, track: ResearchTracks):
-        return self.player_placements[track].get(player, 0)
+        assert 0 <= level <= self.MAX_LEVEL, "Research levels go from 0 to {}".format(self.MAX_LEVEL)
+        old_level = self.get_placement(player, track)
+        if old_level:
+            self.zobrist_hash ^= zobrist_key(RESEARCH_PLACEMENTS, hash(player), track, old_level)
+        if level:
+            self.zobrist_hash ^= zobrist_key(RESEARCH_PLACEMENTS, hash(player), track, level)
+        player_index = self._get_player_index(player)
+        self.placements[player_index, track] = level
+
+    def get_placement(self, player: Player, track: ResearchTracks) -> int:
+        player_index = self._player_indices.get(player)
+        return 0 if player_index is None else int(self.placements[player_index, track])
+
+    def get_player_levels(self, players: List[Player], track: ResearchTracks) -> np.ndarray:
+        """
+        The level of each of the players on the track
+        """
+        levels = np.zeros(len(players), dtype=np.int8)
+        for i, player in enumerate(players):
+            player_index = self._player_indices.get(player)
+            if player_index is not None:
+                levels[i] = self.placements[player_index, track]
+        return levels
+
+    def get_levels(self, track: ResearchTracks) -> np.ndarray:
+        """
+        The level of every player on the track, in the order of self.players
+        """
+        return self.placements[:, track]
 
     def advance_player(self, player: Player, track: ResearchTracks):
         pass
 
-    def get_player_gaiaforming_cost(self, player: Player):
-        level = self.get_placement(player, ResearchTracks.TERRAFORMING)
-        if level <= 1:
-            return 3
-        elif level <= 2:
-            return 2
-        return 1
-
-    def get_player_navigation_ability(self, player: Player):
-        level = self.get_placement(player, ResearchTracks.NAVIGATION)
-        if level <= 1:
-            return 1
-        elif level <= 3:
-            return 2
-        elif level <= 4:
-            return 3
-        return 4
+    def get_player_gaiaforming_cost(self, player: Player) -> int:
+        return int(self.GAIAFORMING_COSTS[self.get_placement(player, ResearchTracks.TERRAFORMING)])
+
+    def get_player_navigation_ability(self, player: Player) -> int:
+        return int(self.NAVIGATION_ABILITIES[self.get_placement(player, ResearchTracks.NAVIGATION)])
 
     def get_player_available_gaiaformers_and_cost(self, player: Player) -> Tuple[int, int]:
-        level = self.get_placement(player, ResearchTracks.GAIA_PROJECT)
-        if level == 0:
-            return 0, 0
-        elif level <= 2:
-            return 1, 6
-        elif level <= 3:
-            return 2, 4
-        return 3, 3
-
-    def get_player_economy_bonus(self, player: Player):
-        level = self.get_placement(player, ResearchTracks.ECONOMY)
-        if level == 1:
-            return Income(credits=2, power=1)
-        elif level == 2:
-            return Income(ore=1, credits=2, power=2)
-        elif level == 3:
-            return Income(ore=1, credits=3, power=3)
-        elif level == 4:
-            return Income(ore=2, credits=4, power=4)
-        return Income()
-
-    def get_player_science_bonus(self, player: Player):
-        level = self.get_placement(player, ResearchTracks.SCIENCE)
-        if level <= 4:
-            return level
-        return 0
+        num_gaiaformers, cost = self.GAIAFORMERS_AND_COSTS[self.get_placement(player, ResearchTracks.GAIA_PROJECT)]
+        return int(num_gaiaformers), int(cost)
+
+    def get_player_economy_bonus(self, player: Player) -> Income:
+        return Income(*(int(amount) for amount in
+                        self.ECONOMY_BONUSES[self.get_placement(player, ResearchTracks.ECONOMY)]))
+
+    def get_player_science_bonus(self, player: Player) -> int:
+        return int(self.SCIENCE_BONUSES[self.get_placement(player, ResearchTracks.SCIENCE)])
+
+    def get_gaiaforming_costs(self) -> np.ndarray:
+        return self.GAIAFORMING_COSTS[self.get_levels(ResearchTracks.TERRAFORMING)]
+
+    def get_navigation_abilities(self) -> np.ndarray:
+        return self.NAVIGATION_ABILITIES[self.get_levels(ResearchTracks.NAVIGATION)]
+
+    def get_available_gaiaformers_and_costs(self) -> np.ndarray:
+        return self.GAIAFORMERS_AND_COSTS[self.get_levels(ResearchTracks.GAIA_PROJECT)]
+
+    def get_economy_bonuses(self) -> np.ndarray:
+        """
+        The economy income of every player, as rows in the order of ResourceVector.FIELDS
+        """
+        return self.ECONOMY_BONUSES[self.get_levels(ResearchTracks.ECONOMY)]
+
+    def get_science_bonuses(self) -> np.ndarray:
+        return self.SCIENCE_BONUSES[self.get_levels(ResearchTracks.SCIENCE)]
@@ -0,0 +1,137 @@
+from __future__ import annotations
+from typing import Union
+from uuid import UUID
+
+import numpy as np
+
+from gaia.board.map import Map
+from gaia.board.buildings import Building
+from gaia.gamestate.gamestate import GameState, ResearchBoard, ScoringBoard
+from gaia.gamestate.players import Player, PlayerResources, Income
+from gaia.turns.bonuses import AvailableRoundBonuses
+from gaia.utils.enums import Factions, BuildingType, ResearchTracks
+
+# Fixed layout of an encoded game state, as a NumPy structured record:
+#
+#     players:         MAX_PLAYERS player records, unused slots have faction NONE
+#     buildings:       per planet of the layout, in planet id order: faction * 8 + building type, or NONE
+#     round_bonuses:   bit mask of the ids of the round bonuses still available
+#
+# Records have the same size for every game on a layout, so arrays of them can be stored in (memory-mapped) files
+# and indexed without any parsing.
+NONE = 255
+MAX_PLAYERS = 4
+
+PLAYER_DTYPE = np.dtype([
+    ("key", "S36"),
+    ("player_id", "u1", (16,)),
+    ("faction", "u1"),
+    ("ore", "u1"),
+    ("credits", "u1"),
+    ("knowledge", "u1"),
+    ("qic", "u1"),
+    ("power_bowls", "u1", (3,)),
+    ("board_income", "u1", (6,)),
+    ("round_bonus", "u1"),
+    ("research", "u1", (len(ResearchTracks),))
+])
+
+INCOME_FIELDS = ("ore", "credits", "knowledge", "qic", "power", "power_tokens")
+
+
+class GameStateCodec(object):
+    """
+    Packs game states on a given layout into fixed-size records and unpacks them back.
+    Only the state of a game is stored, the sectors and planets come from the layout.
+    The codec keeps its own copy of the layout without any buildings, so the layout can be
+    the map of a game in progress.
+    """
+    def __init__(self, layout: Map):
+        self.planet_hexagons = layout.get_planet_distances().planet_hexagons
+        self.layout = layout.copy()
+        for hexagon in self.planet_hexagons:
+            if self.layout.get_hexagon(hexagon).planet.building is not None:
+                self.layout.set_building(hexagon, None)
+        self.dtype = np.dtype([
+            ("players", PLAYER_DTYPE, (MAX_PLAYERS,)),
+            ("buildings", "u1", (len(self.planet_hexagons),)),
+            ("round_bonuses", "<u2")
+        ])
+
+    def encode(self, gamestate: GameState) -> np.void:
+        assert len(gamestate.players) <= MAX_PLAYERS, "At most {} players can be encoded".format(MAX_PLAYERS)
+        record = np.zeros((), dtype=self.dtype)
+
+        players = record["players"]
+        players["faction"] = NONE
+        for slot, (key, player) in enumerate(gamestate.players.items()):
+            self._encode_player(players[slot], key, player, gamestate.research_board)
+
+        buildings = record["buildings"]
+        for planet_id, hexagon in enumerate(self.planet_hexagons):
+            building = gamestate.game_map.get_hexagon(hexagon).planet.building
+            buildings[planet_id] = NONE if building is None else building.faction * 8 + building.building_type
+
+        record["round_bonuses"] = sum(1 << bonus_id for bonus_id in gamestate.round_bonuses.round_bonuses)
+        return record[()]
+
+    def to_bytes(self, gamestate: GameState) -> bytes:
+        return self.encode(gamestate).tobytes()
+
+    def decode(self, record: Union[np.void, bytes]) -> GameState:
+        if isinstance(record, bytes):
+            record = np.frombuffer(record, dtype=self.dtype)[0]
+
+        research_board = ResearchBoard()
+        players = dict()
+        for player_record in record["players"]:
+            if player_record["faction"] != NONE:
+                key = player_record["key"].decode("utf-8")
+                players[key] = self._decode_player(player_record, research_board)
+
+        game_map = self.layout.copy()
+        for planet_id, building in enumerate(record["buildings"]):
+            if building != NONE:
+                game_map.set_building(self.planet_hexagons[planet_id],
+                                      Building(Factions(building // 8), BuildingType(building % 8)))
+
+        round_bonus_ids = [bonus_id for bonus_id in range(16) if record["round_bonuses"] & (1 << bonus_id)]
+        return GameState(players, game_map, research_board, ScoringBoard(),
+                         AvailableRoundBonuses.from_ids(round_bonus_ids))
+
+    @staticmethod
+    def _encode_player(player_record: np.void, key: str, player: Player, research_board: ResearchBoard):
+        resources = player.player_resources
+        player_record["key"] = key.encode("utf-8")
+        player_record["player_id"] = np.frombuffer(player._player_id.bytes, dtype=np.uint8)
+        player_record["faction"] = player.faction
+        player_record["ore"] = resources.ore
+        player_record["credits"] = resources.credits
+        player_record["knowledge"] = resources.knowledge
+        player_record["qic"] = resources.qic
+        player_record["power_bowls"] = [resources.power_bowls[bowl] for bowl in range(3)]
+        player_record["board_income"] = [getattr(player.board_income, field) for field in INCOME_FIELDS]
+        player_record["round_bonus"] = 0 if player.round_bonus is None else player.round_bonus.id
+        player_record["research"] = [research_board.get_placement(player, track) for track in ResearchTracks]
+
+    @staticmethod
+    def _decode_player(player_record: np.void, research_board: ResearchBoard) -> Player:
+        player = Player(Factions(player_record["faction"]))
+        player._player_id = UUID(bytes=player_record["player_id"].tobytes())
+        player.player_resources = PlayerResources(
+            ore=int(player_record["ore"]),
+            credits=int(player_record["credits"]),
+            knowledge=int(player_record["knowledge"]),
+            qic=int(player_record["qic"]),
+            power_bowls={bowl: int(tokens) for bowl, tokens in enumerate(player_record["power_bowls"])}
+        )
+        player.board_income = Income(*(int(value) for value in player_record["board_income"]))
+
+        if player_record["round_bonus"]:
+            round_bonuses = AvailableRoundBonuses.from_ids([player_record["round_bonus"]]).round_bonuses
+            player.round_bonus = round_bonuses[player_record["round_bonus"]]
+
+        for track, level in zip(ResearchTracks, player_record["research"]):
+            if level:
+                research_board.place_player(player, track, int(level))
+        return player
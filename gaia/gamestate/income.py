@@ -0,0 +1,69 @@
+from __future__ import annotations
+from typing import List, Sequence
+
+import numpy as np
+
+from gaia.gamestate import power
+from gaia.gamestate.players import Player, PlayerResources, Income, ResourceVector
+from gaia.utils.enums import ResearchTracks
+
+ORE, CREDITS, KNOWLEDGE, QIC, POWER, POWER_TOKENS = range(len(ResourceVector.FIELDS))
+MAX_RESOURCES = np.array([PlayerResources.MAX_ORE, PlayerResources.MAX_CREDITS, PlayerResources.MAX_KNOWLEDGE,
+                          np.iinfo(np.int32).max])
+
+
+def get_income(gamestate, player: Player) -> Income:
+    """
+    The income of a player in the income phase: board income, economy and science research, and round bonus
+    """
+    research_board = gamestate.research_board
+    income = (player.board_income +
+              research_board.get_player_economy_bonus(player) +
+              Income(knowledge=research_board.get_player_science_bonus(player)))
+    if player.round_bonus is not None:
+        income = income + player.round_bonus.income_bonus
+    return income
+
+
+def get_incomes(gamestate, players: List[Player]) -> np.ndarray:
+    """
+    get_income for every player of a game at once, as rows in the order of ResourceVector.FIELDS
+    """
+    research_board = gamestate.research_board
+    incomes = ResourceVector.stack([player.board_income for player in players]).astype(np.int32)
+    incomes += research_board.ECONOMY_BONUSES[research_board.get_player_levels(players, ResearchTracks.ECONOMY)]
+    incomes[:, KNOWLEDGE] += research_board.SCIENCE_BONUSES[
+        research_board.get_player_levels(players, ResearchTracks.SCIENCE)]
+    for i, player in enumerate(players):
+        if player.round_bonus is not None:
+            incomes[i] += player.round_bonus.income_bonus.to_tuple()
+    return incomes
+
+
+def apply_income_phase(gamestates: Sequence) -> None:
+    """
+    Gives every player of every game their income, in one batch across all games.
+    Resources are capped at their maximums, and power tokens are gained before power is charged.
+    """
+    players, incomes = [], []
+    for gamestate in gamestates:
+        game_players = list(gamestate.players.values())
+        players.extend(game_players)
+        incomes.append(get_incomes(gamestate, game_players))
+    if not players:
+        return
+
+    incomes = np.concatenate(incomes)
+    resources = np.array([(p.player_resources.ore, p.player_resources.credits, p.player_resources.knowledge,
+                           p.player_resources.qic) for p in players], dtype=np.int32)
+    bowls = np.array([p.player_resources.bowls for p in players], dtype=np.int32)
+
+    resources = np.minimum(resources + incomes[:, :POWER], np.maximum(MAX_RESOURCES, resources))
+    bowls[:, 0] += incomes[:, POWER_TOKENS]
+    bowls = power.gain_power_batch(bowls, incomes[:, POWER])
+
+    for player, (ore, credits, knowledge, qic), player_bowls in zip(players, resources.tolist(), bowls.tolist()):
+        player_resources = player.player_resources
+        player_resources.ore, player_resources.credits = ore, credits
+        player_resources.knowledge, player_resources.qic = knowledge, qic
+        player_resources.power_bowls[0], player_resources.power_bowls[1], player_resources.power_bowls[2] = player_bowls
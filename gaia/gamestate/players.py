@@ -1,11 +1,16 @@
 from __future__ import annotations
-from dataclasses import dataclass
-from typing import Dict
+from dataclasses import dataclass, replace
+from typing import Dict, Sequence
 from uuid import uuid4
+from copy import copy
 from abc import abstractmethod
 
+import numpy as np
+
+from gaia.gamestate import power
 from gaia.utils.enums import PlanetType, Factions
 from gaia.utils.utils import CustomJSONSerialization, obj_to_json
+from gaia.utils.zobrist import zobrist_key, PLAYER_RESOURCES, HELD_ROUND_BONUSES
 
 
 class Player(object):
@@ -21,20 +26,55 @@ class Player(object):
         return str(self._player_id)
 
     def __eq__(self, other):
-        return self.player_id == other.player_id
+        return self._player_id == other._player_id
 
     def __hash__(self):
         return self._player_id.int
 
+    def copy(self) -> Player:
+        """
+        Copy of this player with its own resources, which can be changed without affecting this player
+        """
+        player_copy = copy(self)
+        player_copy.player_resources = self.player_resources.copy()
+        return player_copy
+
+    def zobrist_hash(self) -> int:
+        """
+        Zobrist hash of the resources and round bonus of this player.
+        Computed on demand, as the resources are changed in place all over the code base and are only a handful of
+        numbers.
+        """
+        player_key = hash(self)
+        resources = self.player_resources
+        resource_values = (resources.ore, resources.credits, resources.knowledge, resources.qic,
+                           resources.power_bowls[0], resources.power_bowls[1], resources.power_bowls[2])
+
+        zobrist_hash = 0
+        for i, value in enumerate(resource_values):
+            zobrist_hash ^= zobrist_key(PLAYER_RESOURCES, player_key, i, value)
+        if self.round_bonus is not None:
+            zobrist_hash ^= zobrist_key(HELD_ROUND_BONUSES, player_key, self.round_bonus.id)
+        return zobrist_hash
+
     @abstractmethod
     def get_distance_from_planet_color(self, planet: PlanetType) -> int:
         pass
 
-    def can_afford(self, cost: Cost):
-        player_resources = self.player_resources.to_json()
+    def can_afford(self, cost: Cost) -> bool:
+        resources = self.player_resources
+        return (resources.ore >= cost.ore and
+                resources.credits >= cost.credits and
+                resources.knowledge >= cost.knowledge and
+                resources.qic >= cost.qic and
+                power.get_power_payment(resources.bowls, cost.power) is not None and
+                resources.num_power_tokens >= cost.power_tokens)
 
-        return all(player_resources[key] >= cost[key] for key in list(cost.__dict__.keys())
-                   if key in player_resources)
+    def affordable(self, costs: Sequence[Cost]) -> np.ndarray:
+        """
+        Mask of the costs the player can afford, i.e. of candidate actions during move generation
+        """
+        return np.all(ResourceVector.stack(costs) <= self.player_resources.to_vector(), axis=1)
 
 
 @dataclass
@@ -49,14 +89,55 @@ class PlayerResources(CustomJSONSerialization):
     MAX_KNOWLEDGE = 15
     MAX_CREDITS = 30
 
-    def gain_power(self, power: int):
-        for i in range(power):
-            if self.power_bowls[0] > 0:
-                self.power_bowls[1] += 1
-                self.power_bowls[0] -= 1
-            elif self.power_bowls[1] > 0:
-                self.power_bowls[2] += 1
-                self.power_bowls[1] -= 1
+    def copy(self) -> PlayerResources:
+        return replace(self, power_bowls=dict(self.power_bowls))
+
+    @property
+    def num_power_tokens(self) -> int:
+        return self.power_bowls[0] + self.power_bowls[1] + self.power_bowls[2]
+
+    def to_vector(self) -> np.ndarray:
+        """
+        The resources available to pay a cost, in the order of ResourceVector.FIELDS
+        """
+        return np.array([self.ore, self.credits, self.knowledge, self.qic, power.get_max_payable_power(self.bowls),
+                         self.num_power_tokens],
+                        dtype=ResourceVector.DTYPE)
+
+    @property
+    def bowls(self) -> power.PowerBowls:
+        return self.power_bowls[0], self.power_bowls[1], self.power_bowls[2]
+
+    def _set_bowls(self, bowls: power.PowerBowls):
+        self.power_bowls[0], self.power_bowls[1], self.power_bowls[2] = bowls
+
+    def gain_power(self, amount: int):
+        self._set_bowls(power.gain_power(self.bowls, amount))
+
+    def charge_power(self, amount: int) -> int:
+        """
+        Charges power offered by another player's building, returning the victory point cost
+        """
+        bowls, victory_point_cost = power.charge_power(self.bowls, amount)
+        self._set_bowls(bowls)
+        return victory_point_cost
+
+    def spend_power(self, amount: int):
+        """
+        Spends the power, burning as few tokens as needed to pay for it first
+        """
+        num_burned = power.get_power_payment(self.bowls, amount)
+        assert num_burned is not None, "Cannot pay {} power".format(amount)
+        self._set_bowls(power.spend_power(power.burn_power(self.bowls, num_burned), amount))
+
+    def burn_power(self, num_burned: int):
+        self._set_bowls(power.burn_power(self.bowls, num_burned))
+
+    def add_power_tokens(self, num_tokens: int):
+        self._set_bowls(power.add_power_tokens(self.bowls, num_tokens))
+
+    def remove_power_tokens(self, num_tokens: int):
+        self._set_bowls(power.remove_power_tokens(self.bowls, num_tokens))
 
     def to_json(self):
         return obj_to_json(self, {
@@ -64,40 +145,60 @@ class PlayerResources(CustomJSONSerialization):
         })
 
 
-@dataclass
-class Income(object):
-    ore: int = 0
-    credits: int = 0
-    knowledge: int = 0
-    qic: int = 0
-    power: int = 0
-    power_tokens: int = 0
-
-    def __add__(self, other: Income):
-        return Income(self.ore + other.ore,
-                      self.credits + other.credits,
-                      self.knowledge + other.knowledge,
-                      self.qic + other.qic,
-                      self.power + other.power,
-                      self.power_tokens + other.power_tokens)
+class ResourceVector(CustomJSONSerialization):
+    """
+    Fixed order vector of small integer amounts of each resource
+    """
+    __slots__ = ("ore", "credits", "knowledge", "qic", "power", "power_tokens")
+    FIELDS = __slots__
+    DTYPE = np.int16
+
+    def __init__(self, ore: int = 0, credits: int = 0, knowledge: int = 0, qic: int = 0, power: int = 0,
+                 power_tokens: int = 0):
+        self.ore = ore
+        self.credits = credits
+        self.knowledge = knowledge
+        self.qic = qic
+        self.power = power
+        self.power_tokens = power_tokens
+
+    def to_tuple(self) -> tuple:
+        return self.ore, self.credits, self.knowledge, self.qic, self.power, self.power_tokens
+
+    @classmethod
+    def stack(cls, vectors: Sequence[ResourceVector]) -> np.ndarray:
+        """
+        The vectors as the rows of a (len(vectors), len(FIELDS)) array
+        """
+        return np.array([vector.to_tuple() for vector in vectors], dtype=cls.DTYPE).reshape(-1, len(cls.FIELDS))
+
+    def __add__(self, other: ResourceVector):
+        return type(self)(self.ore + other.ore,
+                          self.credits + other.credits,
+                          self.knowledge + other.knowledge,
+                          self.qic + other.qic,
+                          self.power + other.power,
+                          self.power_tokens + other.power_tokens)
+
+    def __eq__(self, other):
+        return type(self) is type(other) and self.to_tuple() == other.to_tuple()
 
+    __hash__ = None
 
-@dataclass
-class Cost(object):
-    ore: int = 0
-    credits: int = 0
-    knowledge: int = 0
-    qic: int = 0
-    power: int = 0
-    power_tokens: int = 0
-
-    def __add__(self, other: Cost):
-        return Cost(self.ore + other.ore,
-                    self.credits + other.credits,
-                    self.knowledge + other.knowledge,
-                    self.qic + other.qic,
-                    self.power + other.power,
-                    self.power_tokens + other.power_tokens)
-
-    def __getitem__(self, item):
-        return self.__dict__[item]
+    def __getitem__(self, item: str):
+        return getattr(self, item)
+
+    def __repr__(self):
+        return "{}({})".format(type(self).__name__,
+                               ", ".join("{}={}".format(field, getattr(self, field)) for field in self.FIELDS))
+
+    def to_json(self):
+        return {field: getattr(self, field) for field in self.FIELDS}
+
+
+class Income(ResourceVector):
+    __slots__ = ()
+
+
+class Cost(ResourceVector):
+    __slots__ = ()
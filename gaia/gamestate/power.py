@@ -0,0 +1,96 @@
+from typing import Tuple, Union
+
+import numpy as np
+
+# The power tokens in bowls I, II and III
+PowerBowls = Tuple[int, int, int]
+
+
+def gain_power(bowls: PowerBowls, power: int) -> PowerBowls:
+    """
+    Charges power tokens, moving them from bowl I to bowl II until bowl I is empty, then from bowl II to bowl III.
+    Power that cannot be charged any further is lost.
+    """
+    first, second, third = bowls
+    from_first = min(power, first)
+    from_second = min(power - from_first, second + from_first)
+    return first - from_first, second + from_first - from_second, third + from_second
+
+
+def get_charge_capacity(bowls: PowerBowls) -> int:
+    """
+    The most power that can be charged before every token is in bowl III
+    """
+    return 2 * bowls[0] + bowls[1]
+
+
+def charge_power(bowls: PowerBowls, power: int) -> Tuple[PowerBowls, int]:
+    """
+    Charges power offered by another player's building, which costs one victory point less than the power charged.
+    Returns the new bowls and the victory point cost.
+    """
+    charged = min(power, get_charge_capacity(bowls))
+    return gain_power(bowls, charged), max(charged - 1, 0)
+
+
+def spend_power(bowls: PowerBowls, power: int) -> PowerBowls:
+    """
+    Spends power, moving the tokens from bowl III back to bowl I
+    """
+    first, second, third = bowls
+    assert third >= power, "Cannot spend {} power with {} tokens in bowl III".format(power, third)
+    return first + power, second, third - power
+
+
+def burn_power(bowls: PowerBowls, num_burned: int) -> PowerBowls:
+    """
+    Moves num_burned tokens from bowl II to bowl III, removing another num_burned tokens from bowl II from the game
+    """
+    first, second, third = bowls
+    assert second >= 2 * num_burned, "Cannot burn {} power with {} tokens in bowl II".format(num_burned, second)
+    return first, second - 2 * num_burned, third + num_burned
+
+
+def add_power_tokens(bowls: PowerBowls, num_tokens: int) -> PowerBowls:
+    first, second, third = bowls
+    return first + num_tokens, second, third
+
+
+def remove_power_tokens(bowls: PowerBowls, num_tokens: int) -> PowerBowls:
+    """
+    Removes tokens from the lowest bowls first
+    """
+    first, second, third = bowls
+    assert first + second + third >= num_tokens, "Cannot remove {} power tokens".format(num_tokens)
+    from_first = min(num_tokens, first)
+    from_second = min(num_tokens - from_first, second)
+    from_third = num_tokens - from_first - from_second
+    return first - from_first, second - from_second, third - from_third
+
+
+def get_max_payable_power(bowls: PowerBowls) -> int:
+    """
+    The most power that can be spent, burning every pair of tokens in bowl II if needed
+    """
+    return bowls[2] + bowls[1] // 2
+
+
+def get_power_payment(bowls: PowerBowls, power: int) -> Union[int, None]:
+    """
+    The cheapest way to pay the power, as the number of tokens that have to be burned first (burning removes tokens
+    from the game, so as few as possible are burned), or None if the power cannot be paid
+    """
+    num_burned = max(power - bowls[2], 0)
+    if 2 * num_burned > bowls[1]:
+        return None
+    return num_burned
+
+
+def gain_power_batch(bowls: np.ndarray, power: np.ndarray) -> np.ndarray:
+    """
+    gain_power for many players at once, with a row of bowls and an amount of power per player
+    """
+    from_first = np.minimum(power, bowls[:, 0])
+    from_second = np.minimum(power - from_first, bowls[:, 1] + from_first)
+    return np.stack([bowls[:, 0] - from_first, bowls[:, 1] + from_first - from_second, bowls[:, 2] + from_second],
+                    axis=1)
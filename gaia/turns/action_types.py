@@ -1,6 +1,8 @@
 from __future__ import annotations
 from abc import ABC, abstractmethod
-from typing import Tuple
+from typing import Tuple, Hashable
+
+from gaia.turns.deltas import Delta, NO_CHANGE
 
 
 class Action(ABC):
@@ -14,6 +16,12 @@ class Action(ABC):
     def __str__(self):
         return str(type(self).__name__)
 
+    def cache_key(self) -> Hashable:
+        """
+        Identifies this action and its parameters, for caching results computed for it
+        """
+        return (type(self),) + tuple(sorted(vars(self).items()))
+
 
 class ModifiesFinalActionWithBonus(object):
     @abstractmethod
@@ -34,9 +42,15 @@ class FinalAction(Action):
         pass
 
     @abstractmethod
-    def perform_action(self, gamestate, player_id: str) -> Tuple[bool, str]:
+    def create_delta(self, gamestate, player_id: str) -> Delta:
+        """
+        The change this action makes to the game state, which can be applied and undone with the game state
+        """
         pass
 
+    def perform_action(self, gamestate, player_id: str):
+        gamestate.apply(self.create_delta(gamestate, player_id))
+
 
 class FreeAction(Action):
     """
@@ -52,9 +66,15 @@ class FreeAction(Action):
         pass
 
     @abstractmethod
-    def perform_action(self, gamestate, player_id: str) -> Tuple[bool, str]:
+    def create_delta(self, gamestate, player_id: str) -> Delta:
+        """
+        The change this action makes to the game state, which can be applied and undone with the game state
+        """
         pass
 
+    def perform_action(self, gamestate, player_id: str):
+        gamestate.apply(self.create_delta(gamestate, player_id))
+
 
 class PartialAction(Action, ModifiesFinalActionWithBonus):
     """
@@ -68,3 +88,7 @@ class PartialAction(Action, ModifiesFinalActionWithBonus):
     @abstractmethod
     def validate_next_action(self, action: FinalAction) -> bool:
         pass
+
+    def create_delta(self, gamestate, player_id: str) -> Delta:
+        # Partial actions only change the game state through the final action they modify
+        return NO_CHANGE
@@ -8,6 +8,7 @@ from gaia.board.buildings import Building
 from gaia.utils.enums import PlanetType, BuildingType
 
 from gaia.turns.action_types import Action, FreeAction, PartialAction, FinalAction
+from gaia.turns.deltas import Delta, BuildingDelta, ResourceDelta, NO_CHANGE
 from gaia.turns.action_modifiers import NavigationModifiable, GaiaformingRequirementsModifiable, HasHexagonLocation
 
 
@@ -21,8 +22,8 @@ class ExchangeOreForCreditAction(FreeAction):
     def validate(self, gamestate, player_id: str) -> Tuple[bool, str]:
         pass
 
-    def perform_action(self, gamestate, player_id: str) -> Tuple[bool, str]:
-        pass
+    def create_delta(self, gamestate, player_id: str) -> Delta:
+        return ResourceDelta(player_id, ore=-self.num_times, credits=self.num_times)
 
 
 class IllegalFinalActionException(Exception):
@@ -114,16 +115,17 @@ class PlaceMineAction(FinalAction, NavigationModifiable, GaiaformingRequirements
 
     def _planet_is_in_range(self, gamestate, game_map, player) -> bool:
         navigation_range = self.base_navigation + gamestate.research_board.get_player_navigation_ability(player)
-        hexagons_in_range = game_map.get_hexagons_in_range(self.hexagon, navigation_range, only_inhabited=True)
-
-        return any(hexagon.planet.building.faction == player.faction for hexagon in hexagons_in_range)
+        return game_map.faction_has_building_in_range(player.faction, self.hexagon, navigation_range)
 
-    def perform_action(self, gamestate, player_id: str):
+    def create_delta(self, gamestate, player_id: str) -> Delta:
         player = gamestate.players[player_id]
 
-        if not gamestate.game_map.inhabit_planet(self.hexagon, Building(player.faction, BuildingType.MINE)):
+        map_hexagon = gamestate.game_map.get_hexagon(self.hexagon)
+        if map_hexagon is None or map_hexagon.planet is None:
             raise RuntimeError("Unable to inhabit planet")
 
+        return BuildingDelta(self.hexagon, map_hexagon.planet.building, Building(player.faction, BuildingType.MINE))
+
 
 class StartGaiaProjectAction(FinalAction, NavigationModifiable, HasHexagonLocation):
     def __init__(self, hexagon: Hexagon):
@@ -133,13 +135,13 @@ class StartGaiaProjectAction(FinalAction, NavigationModifiable, HasHexagonLocati
     def validate(self, gamestate, player_id: str):
         pass
 
-    def perform_action(self, gamestate, player_id: str):
-        pass
+    def create_delta(self, gamestate, player_id: str) -> Delta:
+        return NO_CHANGE
 
 
 class PassAction(FinalAction):
     def validate(self, gamestate, player: Player) -> Tuple[bool, str]:
         return True, "It is always valid to pass at the end of the turn"
 
-    def perform_action(self, gamestate, player_id: str):
-        pass
+    def create_delta(self, gamestate, player_id: str) -> Delta:
+        return NO_CHANGE
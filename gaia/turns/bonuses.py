@@ -1,3 +1,4 @@
+from __future__ import annotations
 from dataclasses import dataclass
 from typing import List, Union, Type
 from random import sample
@@ -42,7 +43,25 @@ class IllegalRoundBonusSelectionException(Exception):
 
 class AvailableRoundBonuses(object):
     def __init__(self, num_bonuses):
-        round_bonuses = [
+        bonuses_to_keep = sample(self.get_all_round_bonuses(), num_bonuses)
+        self.round_bonuses = {
+            round_bonus.id: round_bonus for round_bonus in bonuses_to_keep
+        }
+
+    @classmethod
+    def from_ids(cls, bonus_ids: List[int]) -> AvailableRoundBonuses:
+        """
+        The round bonuses with the given ids, rather than a random sample of them
+        """
+        available_round_bonuses = cls.__new__(cls)
+        available_round_bonuses.round_bonuses = {
+            round_bonus.id: round_bonus for round_bonus in cls.get_all_round_bonuses() if round_bonus.id in bonus_ids
+        }
+        return available_round_bonuses
+
+    @staticmethod
+    def get_all_round_bonuses() -> List[RoundBonus]:
+        return [
             RoundBonus(
                 id=1,
                 income_bonus=Income(ore=1, knowledge=1),
@@ -119,10 +138,5 @@ class AvailableRoundBonuses(object):
             )
         ]
 
-        bonuses_to_keep = sample(round_bonuses, num_bonuses)
-        self.round_bonuses = {
-            round_bonus.id: round_bonus for round_bonus in bonuses_to_keep
-        }
-
     def take_round_bonus(self, player, bonus_id):
         pass
@@ -0,0 +1,90 @@
+from __future__ import annotations
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Tuple, Union
+
+from gaia.board.hexagons import Hexagon
+from gaia.board.buildings import Building
+
+
+class Delta(ABC):
+    """
+    A reversible change to a game state, produced by an action.
+    Applying and then undoing a delta leaves the game state as it was, so hypothetical moves can be
+    explored on one game state instead of on copies of it.
+    """
+    @abstractmethod
+    def apply(self, gamestate):
+        pass
+
+    @abstractmethod
+    def undo(self, gamestate):
+        pass
+
+
+@dataclass(frozen=True)
+class BuildingDelta(Delta):
+    """
+    Replaces the building on the planet at hexagon (None for no building)
+    """
+    hexagon: Hexagon
+    old_building: Union[Building, None]
+    new_building: Union[Building, None]
+
+    def apply(self, gamestate):
+        self._set_building(gamestate, self.new_building)
+
+    def undo(self, gamestate):
+        self._set_building(gamestate, self.old_building)
+
+    def _set_building(self, gamestate, building: Union[Building, None]):
+        if not gamestate.game_map.set_building(self.hexagon, building):
+            raise RuntimeError("There is no planet at {}".format(str(self.hexagon)))
+
+
+@dataclass(frozen=True)
+class ResourceDelta(Delta):
+    """
+    Adds the given amounts (which can be negative) to the resources of a player
+    """
+    player_id: str
+    ore: int = 0
+    credits: int = 0
+    knowledge: int = 0
+    qic: int = 0
+    power_bowls: Tuple[int, int, int] = (0, 0, 0)
+
+    def apply(self, gamestate):
+        self._add(gamestate, 1)
+
+    def undo(self, gamestate):
+        self._add(gamestate, -1)
+
+    def _add(self, gamestate, sign: int):
+        player_resources = gamestate.players[self.player_id].player_resources
+        player_resources.ore += sign * self.ore
+        player_resources.credits += sign * self.credits
+        player_resources.knowledge += sign * self.knowledge
+        player_resources.qic += sign * self.qic
+        for bowl, amount in enumerate(self.power_bowls):
+            player_resources.power_bowls[bowl] += sign * amount
+
+
+@dataclass(frozen=True)
+class CompositeDelta(Delta):
+    """
+    Several deltas applied in order, and undone in reverse order
+    """
+    deltas: Tuple[Delta, ...] = ()
+
+    def apply(self, gamestate):
+        for delta in self.deltas:
+            delta.apply(gamestate)
+
+    def undo(self, gamestate):
+        for delta in reversed(self.deltas):
+            delta.undo(gamestate)
+
+
+# The delta of actions that don't change the game state
+NO_CHANGE = CompositeDelta()
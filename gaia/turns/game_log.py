@@ -0,0 +1,201 @@
+from __future__ import annotations
+from typing import BinaryIO, Dict, List, Tuple, Union
+import struct
+
+from gaia.board.hexagons import Hexagon
+from gaia.gamestate.gamestate import GameState
+from gaia.gamestate.gamestate_codec import GameStateCodec
+from gaia.turns.action_types import Action, PartialAction
+from gaia.turns.action_modifiers import NavigationModifiable, GaiaformingRequirementsModifiable, HasHexagonLocation
+from gaia.turns.actions import (PlaceMineAction, StartGaiaProjectAction, ExchangeOreForCreditAction, PassAction,
+                                GaiaformAction, GainRangeAction)
+from gaia.turns.turn_validator import Turn
+
+# Binary format of a game log file, a sequence of entries (all values little endian):
+#
+#     entry:      kind (c), payload length (I), payload
+#     snapshot:   kind b"S", payload: turn number (I), state packed by GameStateCodec
+#     turn:       kind b"T", payload: player key length (B), player key (utf-8), number of actions (B), actions
+#     action:     action type (B), hexagon x (b), hexagon z (b), number of times (B),
+#                 base navigation (B), base free gaiaforming (B)
+#
+# The first entry is a snapshot of the state the game started from.
+ENTRY_HEADER = struct.Struct("<cI")
+SNAPSHOT_HEADER = struct.Struct("<I")
+ACTION = struct.Struct("<BbbBBB")
+
+SNAPSHOT = b"S"
+TURN = b"T"
+
+ACTION_TYPES = (PlaceMineAction, StartGaiaProjectAction, ExchangeOreForCreditAction, PassAction,
+                GaiaformAction, GainRangeAction)
+
+
+class InvalidTurnException(Exception):
+    pass
+
+
+class CorruptGameLogException(Exception):
+    pass
+
+
+def encode_action(action: Action) -> bytes:
+    hexagon = action.hexagon if isinstance(action, HasHexagonLocation) else Hexagon(0, 0)
+    return ACTION.pack(ACTION_TYPES.index(type(action)),
+                       hexagon.x,
+                       hexagon.z,
+                       getattr(action, "num_times", 0),
+                       action.base_navigation if isinstance(action, NavigationModifiable) else 0,
+                       action.base_free_gaiaforming if isinstance(action, GaiaformingRequirementsModifiable) else 0)
+
+
+def decode_action(data: bytes, offset: int = 0) -> Action:
+    action_type, x, z, num_times, base_navigation, base_free_gaiaforming = ACTION.unpack_from(data, offset)
+    action_class = ACTION_TYPES[action_type]
+
+    if issubclass(action_class, HasHexagonLocation):
+        action = action_class(Hexagon(x, z))
+    elif action_class is ExchangeOreForCreditAction:
+        action = action_class(num_times)
+    else:
+        action = action_class()
+
+    if isinstance(action, NavigationModifiable):
+        action.base_navigation = base_navigation
+    if isinstance(action, GaiaformingRequirementsModifiable):
+        action.base_free_gaiaforming = base_free_gaiaforming
+    return action
+
+
+def encode_turn(player_id: str, actions: List[Action]) -> bytes:
+    key = player_id.encode("utf-8")
+    return b"".join([struct.pack("<B", len(key)), key, struct.pack("<B", len(actions))] +
+                    [encode_action(action) for action in actions])
+
+
+def decode_turn(data: bytes) -> Tuple[str, List[Action]]:
+    key_length = data[0]
+    player_id = data[1:1 + key_length].decode("utf-8")
+    num_actions = data[1 + key_length]
+    offset = 2 + key_length
+    return player_id, [decode_action(data, offset + i * ACTION.size) for i in range(num_actions)]
+
+
+def replay_turn(gamestate: GameState, player_id: str, actions: List[Action]):
+    for action in actions:
+        if not isinstance(action, PartialAction):
+            action.perform_action(gamestate, player_id)
+
+
+class GameLog(object):
+    """
+    Append-only log of the validated turns of a game, with a packed snapshot of the game state every
+    snapshot_interval turns. Any earlier state of the game is rebuilt from the nearest snapshot before it,
+    replaying at most snapshot_interval - 1 turns.
+
+    If a file is given, every entry is also appended to it, so the game can be recovered with GameLog.load.
+    """
+    def __init__(self, initial_state: GameState, codec: GameStateCodec, snapshot_interval: int = 16,
+                 file: Union[BinaryIO, None] = None):
+        assert snapshot_interval > 0, "snapshot_interval must be greater than zero"
+        self.codec = codec
+        self.snapshot_interval = snapshot_interval
+        self.file = file
+        self._turns = []  # type: List[bytes]
+        self._snapshots = dict()  # type: Dict[int, bytes]
+        self._state = initial_state
+        self._write_snapshot()
+
+    def __len__(self):
+        return len(self._turns)
+
+    @property
+    def current_state(self) -> GameState:
+        return self._state
+
+    def append(self, actions: List[Action], player_id: str):
+        """
+        Validates the turn against the current state, then performs it and records it
+        """
+        turn = Turn(list(actions), self._state, player_id)
+        valid, validation_errors = turn.validate()
+        if not valid:
+            raise InvalidTurnException("\n".join(validation_errors))
+
+        replay_turn(self._state, player_id, turn.actions)
+        self._write_turn(encode_turn(player_id, turn.actions))
+        if len(self._turns) % self.snapshot_interval == 0:
+            self._write_snapshot()
+
+    def get_turn(self, turn_number: int) -> Tuple[str, List[Action]]:
+        """
+        The player id and actions of a turn, numbered from 0
+        """
+        return decode_turn(self._turns[turn_number])
+
+    def state_at(self, turn_number: int) -> GameState:
+        """
+        The state of the game after the given number of turns
+        """
+        assert 0 <= turn_number <= len(self._turns), "There is no state after {} turns".format(turn_number)
+
+        snapshot_turn = max(snapshot for snapshot in self._snapshots if snapshot <= turn_number)
+        gamestate = self.codec.decode(self._snapshots[snapshot_turn])
+        for turn in self._turns[snapshot_turn:turn_number]:
+            replay_turn(gamestate, *decode_turn(turn))
+        return gamestate
+
+    def _write_turn(self, turn: bytes):
+        self._turns.append(turn)
+        self._write_entry(TURN, turn)
+
+    def _write_snapshot(self):
+        snapshot = self.codec.to_bytes(self._state)
+        self._snapshots[len(self._turns)] = snapshot
+        self._write_entry(SNAPSHOT, SNAPSHOT_HEADER.pack(len(self._turns)) + snapshot)
+
+    def _write_entry(self, kind: bytes, payload: bytes):
+        if self.file is not None:
+            self.file.write(ENTRY_HEADER.pack(kind, len(payload)) + payload)
+            self.file.flush()
+
+    @classmethod
+    def load(cls, file: BinaryIO, codec: GameStateCodec, snapshot_interval: int = 16) -> GameLog:
+        """
+        Recovers a game log from the entries in a file, which further entries will be appended to.
+        Raises CorruptGameLogException if the file has no complete snapshot to start the game from.
+        """
+        turns, snapshots = [], dict()
+        while True:
+            entry_start = file.tell()
+            header = file.read(ENTRY_HEADER.size)
+            if len(header) < ENTRY_HEADER.size:
+                payload = None
+            else:
+                kind, length = ENTRY_HEADER.unpack(header)
+                payload = file.read(length)
+                payload = payload if len(payload) == length else None
+
+            if payload is None:
+                if file.tell() > entry_start:
+                    # Drops the last entry, which was only partially written, i.e. because its writer crashed
+                    file.seek(entry_start)
+                    file.truncate()
+                break
+
+            if kind == TURN:
+                turns.append(payload)
+            else:
+                snapshots[SNAPSHOT_HEADER.unpack_from(payload)[0]] = payload[SNAPSHOT_HEADER.size:]
+
+        if 0 not in snapshots:
+            raise CorruptGameLogException("The game log has no complete snapshot of the state the game started from")
+
+        game_log = cls.__new__(cls)
+        game_log.codec = codec
+        game_log.snapshot_interval = snapshot_interval
+        game_log.file = file
+        game_log._turns = turns
+        game_log._snapshots = snapshots
+        game_log._state = game_log.state_at(len(turns))
+        return game_log
@@ -1,10 +1,10 @@
 from __future__ import annotations
 from typing import List, Tuple
 from dataclasses import dataclass
-from copy import deepcopy
 
 from gaia.turns.actions import Action, PartialAction
 from gaia.gamestate.gamestate import GameState
+from gaia.utils.transposition_cache import TranspositionCache
 
 
 @dataclass()
@@ -13,7 +13,22 @@ class Turn(object):
     gamestate: GameState
     player_id: str
 
-    def validate(self) -> Tuple[bool, List[str]]:
+    def validate(self, cache: TranspositionCache = None) -> Tuple[bool, List[str]]:
+        """
+        Checks the turn can be taken in the game state. If it can, the final action is replaced with the one modified
+        by the partial actions of the turn. Verdicts are memoized in the cache if one is given.
+        """
+        if cache is None:
+            valid, validation_errors = self._validate()
+        else:
+            key = ("validate", self.player_id, tuple(action.cache_key() for action in self.actions))
+            valid, validation_errors = cache.get_or_compute(self.gamestate, key, self._validate)
+
+        if valid:
+            self.actions = self._get_modified_actions()
+        return valid, list(validation_errors)
+
+    def _validate(self) -> Tuple[bool, List[str]]:
         validation_errors = []
 
         validation_errors += self._check_action_doesnt_end_prematurely()
@@ -52,15 +67,22 @@ class Turn(object):
 
         return validation_errors
 
+    def _get_modified_actions(self) -> List[Action]:
+        """
+        The actions of the turn, with the final action modified by the partial actions of the turn
+        """
+        actions = list(self.actions)
+        for action in self.actions:
+            if isinstance(action, PartialAction):
+                actions[-1] = action.modify_final_action(actions[-1])
+        return actions
+
     def _check_all_actions_are_valid(self) -> List[str]:
-        gamestate = deepcopy(self.gamestate)
         validation_errors = []
 
-        for action in self.actions:
-            if isinstance(action, PartialAction):
-                self.actions[-1] = action.modify_final_action(self.actions[-1])
-            else:
-                valid, reason = action.validate(gamestate, self.player_id)
+        for action in self._get_modified_actions():
+            if not isinstance(action, PartialAction):
+                valid, reason = action.validate(self.gamestate, self.player_id)
                 if not valid:
                     validation_errors.append("{} is not valid for the following reason: {}".format(str(action), reason))
 
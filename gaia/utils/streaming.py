@@ -0,0 +1,143 @@
+from __future__ import annotations
+from typing import Callable, Iterator, List, Union
+from collections import deque
+import json
+import threading
+
+
+class StreamEvent(object):
+    """
+    An event pushed to the subscribers of a GameStream.
+
+    Events that are `latest_only` (i.e. the current set of valid moves) replace any queued event of the same
+    kind, since subscribers only ever need the most recent one.
+    """
+    def __init__(self, kind: str, data, latest_only: bool = False):
+        self.kind = kind
+        self.data = data
+        self.latest_only = latest_only
+
+    def to_sse(self, encoder: type = json.JSONEncoder) -> str:
+        return "event: {}\ndata: {}\n\n".format(self.kind, json.dumps(self.data, cls=encoder))
+
+
+class Subscription(object):
+    """
+    The bounded queue of events for a single subscriber.
+
+    When a subscriber falls too far behind, its queued deltas are dropped and replaced by a single snapshot
+    of the current state, so slow consumers never block the producer or grow without bound.
+    """
+    SNAPSHOT = "snapshot"
+
+    def __init__(self, max_queue_size: int, snapshot: Callable[[], StreamEvent]):
+        self.max_queue_size = max_queue_size
+        self._snapshot = snapshot
+        self._queue = deque()
+        self._needs_snapshot = False
+        self._closed = False
+        self._condition = threading.Condition()
+
+    def offer(self, event: StreamEvent) -> None:
+        with self._condition:
+            if self._closed:
+                return
+
+            if event.latest_only:
+                self._queue = deque(e for e in self._queue if e.kind != event.kind)
+
+            if self._needs_snapshot and not event.latest_only:
+                # A snapshot is already due, and will include this change
+                pass
+            elif len(self._queue) >= self.max_queue_size:
+                self._queue = deque(e for e in self._queue if e.latest_only)
+                self._needs_snapshot = True
+                if event.latest_only:
+                    self._queue.append(event)
+            else:
+                self._queue.append(event)
+
+            self._condition.notify()
+
+    def get(self, timeout: Union[float, None] = None) -> Union[StreamEvent, None]:
+        """
+        The next event for this subscriber, waiting up to timeout seconds for one.
+        Returns None on timeout, or once the subscription is closed.
+        """
+        with self._condition:
+            if not self._condition.wait_for(lambda: self._queue or self._needs_snapshot or self._closed, timeout):
+                return None
+            if self._closed:
+                return None
+            if not self._needs_snapshot:
+                return self._queue.popleft()
+            self._needs_snapshot = False
+
+        # Taken without holding the condition, so a producer that publishes while holding a lock the snapshot
+        # needs (i.e. the lock of the game) can't deadlock with this subscriber. Changes published in the meantime
+        # are queued as well, so subscribers skip changes that are already part of the snapshot.
+        return self._snapshot()
+
+    def close(self) -> None:
+        with self._condition:
+            self._closed = True
+            self._queue.clear()
+            self._condition.notify_all()
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def __iter__(self) -> Iterator[StreamEvent]:
+        while not self._closed:
+            event = self.get()
+            if event is not None:
+                yield event
+
+
+class GameStream(object):
+    """
+    Fans out the events of a single game to all of its subscribers without ever blocking on them
+    """
+    def __init__(self, snapshot: Callable[[], StreamEvent], max_queue_size: int = 64):
+        self.snapshot = snapshot
+        self.max_queue_size = max_queue_size
+        self._subscriptions = []  # type: List[Subscription]
+        self._lock = threading.Lock()
+
+    def subscribe(self) -> Subscription:
+        """
+        Changes published while subscribing are missed, so producers should hold the lock they publish changes
+        under while subscribing
+        """
+        subscription = Subscription(self.max_queue_size, self.snapshot)
+        # Every subscriber starts from a snapshot of the current state
+        subscription.offer(self.snapshot())
+        with self._lock:
+            self._subscriptions.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        subscription.close()
+        with self._lock:
+            if subscription in self._subscriptions:
+                self._subscriptions.remove(subscription)
+
+    def close(self) -> None:
+        """
+        Closes every subscription, i.e. once the game is over
+        """
+        with self._lock:
+            subscriptions, self._subscriptions = self._subscriptions, []
+        for subscription in subscriptions:
+            subscription.close()
+
+    @property
+    def num_subscribers(self) -> int:
+        return len(self._subscriptions)
+
+    def publish(self, event: StreamEvent) -> None:
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+        for subscription in subscriptions:
+            subscription.offer(event)
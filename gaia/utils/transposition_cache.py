@@ -0,0 +1,30 @@
+from typing import Any, Callable, Hashable
+
+from gaia.utils.lru_cache import LRUCache
+
+
+class TranspositionCache(object):
+    """
+    Bounded cache of results computed for a game state, keyed by the Zobrist hash of the game state and the
+    layout hash of its map, so results are shared between equal game states reached in different ways.
+    The Zobrist hash only covers the buildings on the map, so the layout hash keeps results apart across layouts.
+    """
+    def __init__(self, max_size: int = 4096):
+        self._entries = LRUCache(max_size)
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def hits(self) -> int:
+        return self._entries.hits
+
+    @property
+    def misses(self) -> int:
+        return self._entries.misses
+
+    def get_or_compute(self, gamestate, key: Hashable, compute: Callable[[], Any]) -> Any:
+        return self._entries.get_or_compute((gamestate.zobrist_hash, gamestate.game_map.layout_hash, key), compute)
+
+    def clear(self) -> None:
+        self._entries.clear()
@@ -1,14 +1,16 @@
-from copy import deepcopy
 from abc import ABC, abstractmethod
 
 
 class CustomJSONSerialization(ABC):
+    # Without this, instances of slotted subclasses (i.e. Hexagon) would still get a __dict__
+    __slots__ = ()
+
     @abstractmethod
     def to_json(self):
         pass
 
 
 def obj_to_json(obj, substitutions):
-    obj_dict = deepcopy(obj.__dict__)
+    obj_dict = dict(obj.__dict__)
     obj_dict.update(substitutions)
     return obj_dict
@@ -0,0 +1,33 @@
+from functools import lru_cache
+
+MASK_64 = (1 << 64) - 1
+
+# Tables of Zobrist keys, one per kind of game state feature, so equal components in different tables
+# get unrelated keys
+BUILDINGS = 1
+RESEARCH_PLACEMENTS = 2
+PLAYER_RESOURCES = 3
+HELD_ROUND_BONUSES = 4
+AVAILABLE_ROUND_BONUSES = 5
+PLANETS = 6
+
+
+def splitmix64(value: int) -> int:
+    value = (value + 0x9E3779B97F4A7C15) & MASK_64
+    value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & MASK_64
+    value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & MASK_64
+    return value ^ (value >> 31)
+
+
+@lru_cache(maxsize=65536)
+def zobrist_key(table: int, *components: int) -> int:
+    """
+    Pseudo random 64 bit key for a game state feature, i.e. (BUILDINGS, hexagon key, faction, building type).
+    The hash of a game state is the XOR of the keys of its features, so adding or removing a feature
+    updates the hash in constant time. Keys are derived from the components rather than drawn from a
+    random table, so hashes are the same across processes.
+    """
+    key = splitmix64(table)
+    for component in components:
+        key = splitmix64(key ^ (component & MASK_64))
+    return key
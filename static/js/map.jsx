@@ -30,6 +30,111 @@ const PlanetColors = {
     10: "#708090"
 }
 
+const BINARY_MAP_MIMETYPE = 'application/vnd.gaia.map';
+const BINARY_MAP_NONE = 255;
+const BINARY_MAP_FORMAT_VERSION = 2;
+
+let screenFactors = function(x, z) {
+  let q = x + z;
+  return [q * 1.5, Math.sqrt(3) / 2 * q - Math.sqrt(3) * x];
+}
+
+// Decodes the compact binary map sent by /map (see gaia/board/binary_map.py for the layout)
+let decodeBinaryMap = function(buffer) {
+  let view = new DataView(buffer);
+  if(view.getUint8(4) != BINARY_MAP_FORMAT_VERSION) {
+    throw new Error(`Unsupported binary map format ${view.getUint8(4)}`);
+  }
+  let version = view.getUint32(6, true);
+  let numSectors = view.getUint16(10, true);
+  let numHexagons = view.getUint16(12, true);
+  let numFederations = view.getUint16(14, true);
+  let offset = 16;
+
+  let readArray = function(ArrayType, count) {
+    let array = new ArrayType(buffer, offset, count);
+    offset += count * ArrayType.BYTES_PER_ELEMENT;
+    return array;
+  };
+
+  // Typed arrays use the platform byte order, which is little endian wherever browsers run
+  let hexagonCounts = readArray(Uint16Array, numSectors);
+  let xOffsets = readArray(Int8Array, numSectors);
+  let zOffsets = readArray(Int8Array, numSectors);
+  let radii = readArray(Uint8Array, numSectors);
+  let xs = readArray(Int8Array, numHexagons);
+  let zs = readArray(Int8Array, numHexagons);
+  let planetTypes = readArray(Uint8Array, numHexagons);
+  let factions = readArray(Uint8Array, numHexagons);
+  let buildingTypes = readArray(Uint8Array, numHexagons);
+
+  let sectors = [];
+  let hexagonIndex = 0;
+  for(let i = 0; i < numSectors; i++) {
+    let hexagons = [];
+    for(let j = hexagonIndex; j < hexagonIndex + hexagonCounts[i]; j++) {
+      let [screen_x, screen_y] = screenFactors(xs[j], zs[j]);
+      let planet = null;
+      if(planetTypes[j] != BINARY_MAP_NONE) {
+        let building = factions[j] == BINARY_MAP_NONE ? null : {faction: factions[j], building_type: buildingTypes[j]};
+        planet = {planet_type: planetTypes[j], building: building};
+      }
+      hexagons.push({x: xs[j], z: zs[j], screen_x_factor: screen_x, screen_y_factor: screen_y, planet: planet});
+    }
+    hexagonIndex += hexagonCounts[i];
+
+    let [sector_x, sector_y] = screenFactors(xOffsets[i], zOffsets[i]);
+    sectors.push({radius: radii[i], x_offset: xOffsets[i], z_offset: zOffsets[i],
+                  screen_x_factor: sector_x, screen_y_factor: sector_y, hexagons: hexagons});
+  }
+
+  let federations = [];
+  for(let i = 0; i < numFederations; i++) {
+    let faction = view.getUint8(offset);
+    let activated = view.getUint8(offset + 1) == 1;
+    let numFederationHexagons = view.getUint16(offset + 2, true);
+    offset += 4;
+    let coordinates = readArray(Int8Array, 2 * numFederationHexagons);
+    let hexagons = [];
+    for(let j = 0; j < numFederationHexagons; j++) {
+      hexagons.push({x: coordinates[2 * j], z: coordinates[2 * j + 1]});
+    }
+    federations.push({faction: faction, activated: activated, hexagons: hexagons});
+  }
+
+  return {version: version, sectors: sectors, federations: federations};
+}
+
+// Applies the changes returned by map/changes to a copy of the sectors and federations
+let applyMapChanges = function(sectors, federations, changes) {
+  sectors = sectors.slice();
+  federations = federations.slice();
+
+  for(let change of changes) {
+    switch(change.type) {
+      case('building'):
+        sectors = sectors.map(sector => {
+          let hexagons = sector.hexagons.map(hexagon => {
+            if(hexagon.x != change.x || hexagon.z != change.z || hexagon.planet == null) {
+              return hexagon;
+            }
+            return Object.assign({}, hexagon, {planet: Object.assign({}, hexagon.planet, {building: change.building})});
+          });
+          return Object.assign({}, sector, {hexagons: hexagons});
+        });
+        break;
+      case('sector'):
+        sectors[change.index] = change.sector;
+        break;
+      case('federation'):
+        federations.push(change.federation);
+        break;
+    }
+  }
+
+  return {sectors: sectors, federations: federations};
+}
+
 let getViewboxSize = function(sectors, hexSize) {
   if(sectors.length == 0) {
     return '0 0 0 0';
@@ -170,6 +275,8 @@ class BoardSelector extends React.Component {
     this.state = {
       game_type: '1p_2p_default',
       board_options: null,
+      game_id: new URLSearchParams(window.location.search).get('game_id'),
+      version: null,
       size: 100,
       sectors: [],
       federations: []
@@ -183,8 +290,15 @@ class BoardSelector extends React.Component {
     if(this.state.board_options !=null) {
       map_url += "&board_options=" + this.state.board_options;
     }
+    if(this.state.game_id != null) {
+      map_url += "&game_id=" + this.state.game_id;
+    }
 
-    fetch(map_url).then(results => {
+    fetch(map_url, {headers: {'Accept': `${BINARY_MAP_MIMETYPE}, application/json;q=0.9`}}).then(results => {
+      this.setState({version: Number(results.headers.get('X-Map-Version'))});
+      if(results.headers.get('Content-Type') == BINARY_MAP_MIMETYPE) {
+        return results.arrayBuffer().then(decodeBinaryMap);
+      }
       return results.json();
     }).then(data => {
       this.setState({
@@ -194,8 +308,77 @@ class BoardSelector extends React.Component {
     });
   }
 
+  // Only fetches what changed on the map since the version the client has
+  getMapChanges() {
+    if(this.state.game_id == null || this.state.version == null) {
+      return;
+    }
+
+    fetch(`map/changes?game_id=${this.state.game_id}&since=${this.state.version}`).then(results => {
+      return results.json();
+    }).then(data => {
+      if(data.snapshot != null) {
+        this.setState({
+          version: data.version,
+          sectors: data.snapshot.sectors,
+          federations: data.snapshot.federations
+        });
+      } else if(data.changes.length > 0) {
+        let updated = applyMapChanges(this.state.sectors, this.state.federations, data.changes);
+        this.setState({
+          version: data.version,
+          sectors: updated.sectors,
+          federations: updated.federations
+        });
+      }
+    });
+  }
+
+  // Receives snapshots and changes pushed by the server, instead of polling for them
+  subscribeToMapStream() {
+    this.mapStream = new EventSource(`map/stream?game_id=${this.state.game_id}`);
+
+    this.mapStream.addEventListener('snapshot', event => {
+      let data = JSON.parse(event.data);
+      this.setState({
+        version: data.version,
+        sectors: data.snapshot.sectors,
+        federations: data.snapshot.federations
+      });
+    });
+
+    this.mapStream.addEventListener('change', event => {
+      let change = JSON.parse(event.data);
+      if(change.version <= this.state.version) {
+        return;
+      }
+      let updated = applyMapChanges(this.state.sectors, this.state.federations, [change]);
+      this.setState({
+        version: change.version,
+        sectors: updated.sectors,
+        federations: updated.federations
+      });
+    });
+  }
+
   componentDidMount() {
     this.getMapData();
+    if(this.state.game_id == null) {
+      return;
+    }
+
+    if(window.EventSource) {
+      this.subscribeToMapStream();
+    } else {
+      this.changesInterval = setInterval(() => this.getMapChanges(), 2000);
+    }
+  };
+
+  componentWillUnmount() {
+    clearInterval(this.changesInterval);
+    if(this.mapStream) {
+      this.mapStream.close();
+    }
   };
 
   async handleChange(event) {
@@ -4,7 +4,8 @@ from gaia.board.planets import Planet
 from gaia.board.hexagons import Hexagon
 
 from gaia.utils.enums import BuildingType, PlanetType
-from gaia.turns.actions import PlaceMineAction
+from gaia.turns.actions import PlaceMineAction, ExchangeOreForCreditAction, PassAction
+from gaia.turns.deltas import BuildingDelta, CompositeDelta, NO_CHANGE
 from gaia.gamestate.players import PlayerResources
 
 from tests.util import TestBuilding
@@ -268,3 +269,37 @@ def test_place_mine_perform_action(planet_hexagons, action, one_sector_gamestate
     assert original_hexagon.planet.planet_type == inhabited_hexagon.planet.planet_type
     assert inhabited_hexagon.planet.building.faction == player.faction
     assert inhabited_hexagon.planet.building.building_type == BuildingType.MINE
+
+
+@pytest.mark.parametrize("planet_hexagons", [
+    [Hexagon(0, 1, planet=Planet(PlanetType.RED))]
+])
+def test_place_mine_delta_apply_and_undo(planet_hexagons, one_sector_gamestate):
+    player = list(one_sector_gamestate.players.values())[0]
+    action = PlaceMineAction(Hexagon(0, 1))
+
+    delta = action.create_delta(one_sector_gamestate, player.player_id)
+    assert isinstance(delta, BuildingDelta) and delta.old_building is None
+
+    one_sector_gamestate.apply(delta)
+    assert one_sector_gamestate.game_map.get_hexagon(Hexagon(0, 1)).planet.building.faction == player.faction
+    assert Hexagon(0, 1) in one_sector_gamestate.game_map.get_faction_hexagons(player.faction)
+
+    one_sector_gamestate.undo(delta)
+    assert one_sector_gamestate.game_map.get_hexagon(Hexagon(0, 1)).planet.building is None
+    assert Hexagon(0, 1) not in one_sector_gamestate.game_map.get_faction_hexagons(player.faction)
+
+
+def test_exchange_and_pass_deltas_apply_and_undo(one_sector_gamestate):
+    player = list(one_sector_gamestate.players.values())[0]
+    resources_before = player.player_resources.copy()
+
+    delta = CompositeDelta((ExchangeOreForCreditAction(2).create_delta(one_sector_gamestate, player.player_id),
+                            PassAction().create_delta(one_sector_gamestate, player.player_id)))
+    one_sector_gamestate.apply(delta)
+    assert (player.player_resources.ore, player.player_resources.credits) == \
+           (resources_before.ore - 2, resources_before.credits + 2)
+
+    one_sector_gamestate.undo(delta)
+    assert player.player_resources == resources_before
+    assert PassAction().create_delta(one_sector_gamestate, player.player_id) is NO_CHANGE
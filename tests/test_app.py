@@ -0,0 +1,138 @@
+import pytest
+import gzip
+import json
+
+pytest.importorskip("flask_restplus")
+import app
+from gaia.board.map import Map
+
+
+@pytest.fixture()
+def client():
+    app.map_response_cache.clear()
+    app.live_games.clear()
+    return app.app.test_client()
+
+
+def start_game(client) -> str:
+    response = client.post('/games')
+    assert response.status_code == 201
+    return response.get_json()["game_id"]
+
+
+def place_mine(client, game_id: str, x: int = 0, z: int = -1):
+    return client.put('/map/buildings', json={"game_id": game_id, "x": x, "z": z, "faction": 0, "building_type": 0})
+
+
+def test_map_etag_and_not_modified(client):
+    response = client.get('/map')
+    etag = response.headers["ETag"]
+
+    assert response.status_code == 200
+    assert client.get('/map', headers={"If-None-Match": etag}).status_code == 304
+    assert client.get('/map', headers={"If-None-Match": '"stale"'}).status_code == 200
+
+
+def test_map_gzip_has_its_own_etag(client):
+    plain = client.get('/map')
+    compressed = client.get('/map', headers={"Accept-Encoding": "gzip"})
+
+    assert "Content-Encoding" not in plain.headers
+    assert compressed.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in compressed.headers["Vary"]
+    assert json.loads(gzip.decompress(compressed.data)) == json.loads(plain.data)
+    assert compressed.headers["ETag"] != plain.headers["ETag"]
+
+    # A client that doesn't accept gzip never revalidates against the compressed representation
+    assert client.get('/map', headers={"If-None-Match": compressed.headers["ETag"]}).status_code == 200
+    assert client.get('/map', headers={"Accept-Encoding": "gzip",
+                                       "If-None-Match": compressed.headers["ETag"]}).status_code == 304
+
+
+@pytest.mark.parametrize("url", ['/map?game_type=', '/map?board_options=lots_o_buildings'])
+def test_random_maps_are_not_cached(client, url):
+    bodies = {client.get(url).data for _ in range(3)}
+
+    assert len(bodies) > 1
+    assert len(app.map_response_cache) == 0
+
+
+@pytest.mark.parametrize("url", ['/map?game_id=unknown', '/map/changes?game_id=unknown&since=0',
+                                 '/map/stream?game_id=unknown'])
+def test_unknown_games_are_not_found(client, url):
+    assert client.get(url).status_code == 404
+    assert len(app.live_games) == 0
+
+
+def test_live_map_changes(client):
+    game_id = start_game(client)
+    initial = client.get('/map?game_id=' + game_id)
+    assert initial.headers["X-Map-Version"] == "0"
+
+    assert place_mine(client, game_id).get_json() == {"version": 1}
+    assert place_mine(client, game_id, x=100, z=100).status_code == 400
+
+    changes = client.get('/map/changes?game_id={}&since=0'.format(game_id)).get_json()
+    assert changes["version"] == 1
+    assert [change["version"] for change in changes["changes"]] == [1]
+    assert client.get('/map/changes?game_id={}&since=1'.format(game_id)).get_json()["changes"] == []
+
+    updated = client.get('/map?game_id=' + game_id, headers={"If-None-Match": initial.headers["ETag"]})
+    assert updated.status_code == 200
+    assert updated.headers["X-Map-Version"] == "1"
+
+
+def test_live_map_changes_fall_back_to_snapshot(client, mocker):
+    mocker.patch.object(Map, "MAX_CHANGE_LOG_LENGTH", 2)
+    game_id = start_game(client)
+    for _ in range(3):
+        place_mine(client, game_id)
+
+    response = client.get('/map/changes?game_id={}&since=0'.format(game_id)).get_json()
+    assert response["version"] == 3
+    assert "changes" not in response
+    assert response["snapshot"] == json.loads(client.get('/map?game_id=' + game_id).data)
+
+
+def test_least_recently_used_games_are_dropped(client, mocker):
+    mocker.patch.object(app.live_games, "max_size", 2)
+    first = start_game(client)
+    subscription = app.live_games.get(first).stream.subscribe()
+    second = start_game(client)
+    start_game(client)
+
+    assert first not in app.live_games and second in app.live_games
+    assert subscription.closed
+    assert client.get('/map?game_id=' + first).status_code == 404
+
+
+def test_live_maps_are_not_revalidated_by_modification_time(client):
+    assert "Last-Modified" in client.get('/map').headers
+
+    game_id = start_game(client)
+    initial = client.get('/map?game_id=' + game_id)
+    assert "Last-Modified" not in initial.headers
+
+    place_mine(client, game_id)
+    updated = client.get('/map?game_id=' + game_id, headers={"If-Modified-Since": "Fri, 01 Jan 2100 00:00:00 GMT"})
+    assert updated.status_code == 200
+    assert updated.headers["X-Map-Version"] == "1"
+
+
+def test_map_stream_sends_snapshot_then_changes(client):
+    game_id = start_game(client)
+    response = client.get('/map/stream?game_id=' + game_id)
+    events = iter(response.response)
+    assert response.mimetype == "text/event-stream"
+
+    snapshot = next(events).decode("utf-8")
+    assert snapshot.startswith("event: snapshot\n")
+    assert json.loads(snapshot.split("data: ", 1)[1])["version"] == 0
+
+    place_mine(client, game_id)
+    change = next(events).decode("utf-8")
+    assert change.startswith("event: change\n")
+    assert json.loads(change.split("data: ", 1)[1])["version"] == 1
+
+    response.close()
+    assert app.live_games.get(game_id).stream.num_subscribers == 0
@@ -0,0 +1,80 @@
+import pytest
+import numpy as np
+
+from gaia.board.hexagons import Hexagon
+from gaia.board.buildings import Building
+from gaia.utils.enums import Factions, BuildingType
+
+
+@pytest.mark.integration
+def test_dense_board_matches_map(default_map):
+    dense_board = default_map.get_dense_board()
+
+    assert dense_board.on_map.sum() == 7 * 19
+    for sector_id, sector in enumerate(default_map.sectors):
+        for hexagon in sector.hexagons:
+            cell = hexagon.x - dense_board.min_x, hexagon.z - dense_board.min_z
+            assert dense_board.sector_ids[cell] == sector_id
+            expected_planet_type = hexagon.planet.planet_type if hexagon.planet else dense_board.NONE
+            assert dense_board.planet_types[cell] == expected_planet_type
+
+
+@pytest.mark.integration
+@pytest.mark.parametrize("center,distance", [
+    (Hexagon(0, 0), 0),
+    (Hexagon(0, 0), 3),
+    (Hexagon(5, -3), 4),
+    (Hexagon(-20, 3), 2)
+])
+def test_dense_board_range_query(default_map, center, distance):
+    dense_board = default_map.get_dense_board()
+    coordinates = dense_board.get_coordinates_in_range(center.x, center.z, distance)
+
+    assert {Hexagon(x, z) for x, z in coordinates} == default_map.get_hexagons_in_range(center, distance)
+
+
+@pytest.mark.integration
+def test_dense_board_follows_map_changes(default_map):
+    dense_board = default_map.get_dense_board()
+    assert not dense_board.occupied().any()
+
+    default_map.inhabit_planet(Hexagon(0, 1), Building(Factions.TERRANS, BuildingType.MINE))
+    assert dense_board.occupied(Factions.TERRANS).sum() == 1
+    assert dense_board.faction_has_building_in_range(Factions.TERRANS, 0, 3, 2)
+    assert not dense_board.faction_has_building_in_range(Factions.TERRANS, 0, 4, 2)
+    assert dense_board.get_distance_to_faction(Factions.TERRANS)[0 - dense_board.min_x, 4 - dense_board.min_z] == 3
+
+    default_map.sectors[0].adjust_offset(20, 20)
+    assert default_map.get_dense_board() is not dense_board
+
+
+def test_dense_board_distances_from_many(one_sector_map):
+    dense_board = one_sector_map.get_dense_board()
+    distances = dense_board.distances_from(np.array([0, 2]), np.array([0, -1]))
+
+    assert distances.shape == (2,) + dense_board.x.shape
+    for i, (x, z) in enumerate([(0, 0), (2, -1)]):
+        expected = np.vectorize(lambda cx, cz: Hexagon(x, z).distance_from_coordinates(cx, cz))(dense_board.x,
+                                                                                             dense_board.z)
+        assert (distances[i] == expected).all()
+
+
+@pytest.mark.parametrize("center, distance", [
+    (Hexagon(0, 0), 2),
+    (Hexagon(1, 1), 4),
+    (Hexagon(-6, 3), 3)
+])
+def test_map_queries_through_dense_board(default_map, center, distance):
+    default_map.inhabit_planet(Hexagon(0, 1), Building(Factions.TERRANS, BuildingType.MINE))
+    default_map.inhabit_planet(Hexagon(1, 1), Building(Factions.TERRANS, BuildingType.MINE))
+    dense_map = default_map.copy()
+    dense_map.enable_dense_board()
+
+    assert dense_map.get_hexagons_in_range(center, distance) == default_map.get_hexagons_in_range(center, distance)
+    assert dense_map.get_hexagons_in_range(center, distance, only_inhabited=True) == \
+        default_map.get_hexagons_in_range(center, distance, only_inhabited=True)
+    assert dense_map.faction_has_building_in_range(Factions.TERRANS, center, distance) == \
+        default_map.faction_has_building_in_range(Factions.TERRANS, center, distance)
+    assert dense_map.get_reachable_planets(Factions.TERRANS, distance, 2) == \
+        default_map.get_reachable_planets(Factions.TERRANS, distance, 2)
+    assert dense_map.get_reachable_planets(Factions.XENOS, distance) == dict()
@@ -0,0 +1,86 @@
+import pytest
+from io import BytesIO
+
+from gaia.board.hexagons import Hexagon
+from gaia.gamestate.gamestate_codec import GameStateCodec
+from gaia.turns.actions import PlaceMineAction, PassAction, GainRangeAction
+from gaia.turns.game_log import (GameLog, InvalidTurnException, CorruptGameLogException, encode_turn,
+                                 decode_turn)
+
+
+@pytest.fixture()
+def codec(test_range_gamestate):
+    return GameStateCodec(test_range_gamestate.game_map.copy())
+
+
+def play_turns(game_log):
+    game_log.append([PassAction()], "p2")
+    game_log.append([GainRangeAction(), PlaceMineAction(Hexagon(0, -1))], "p1")
+    game_log.append([PassAction()], "p2")
+    game_log.append([PassAction()], "p1")
+    game_log.append([PassAction()], "p2")
+
+
+def test_turn_records_round_trip():
+    player_id, actions = decode_turn(encode_turn("p1", [GainRangeAction(), PlaceMineAction(Hexagon(-3, 2))]))
+
+    assert player_id == "p1"
+    assert [type(action) for action in actions] == [GainRangeAction, PlaceMineAction]
+    assert actions[1].hexagon == Hexagon(-3, 2)
+
+
+def test_game_log_rebuilds_historical_states(test_range_gamestate, codec):
+    initial_hash = test_range_gamestate.zobrist_hash
+    game_log = GameLog(test_range_gamestate, codec, snapshot_interval=2)
+    play_turns(game_log)
+
+    assert len(game_log) == 5
+    assert game_log.state_at(0).zobrist_hash == initial_hash
+    assert game_log.state_at(1).zobrist_hash == initial_hash
+    assert game_log.state_at(1).game_map.get_hexagon(Hexagon(0, -1)).planet.building is None
+    assert game_log.state_at(3).game_map.get_hexagon(Hexagon(0, -1)).planet.building is not None
+    assert game_log.state_at(5).zobrist_hash == game_log.current_state.zobrist_hash
+    assert game_log.get_turn(1)[1][1].base_navigation == GainRangeAction.NAVIGATION_BONUS
+
+
+def test_game_log_codec_on_the_live_map(test_range_gamestate):
+    initial_hash = test_range_gamestate.zobrist_hash
+    game_log = GameLog(test_range_gamestate, GameStateCodec(test_range_gamestate.game_map))
+    play_turns(game_log)
+
+    assert game_log.current_state.game_map.get_hexagon(Hexagon(0, -1)).planet.building is not None
+    assert game_log.state_at(0).game_map.get_hexagon(Hexagon(0, -1)).planet.building is None
+    assert game_log.state_at(0).zobrist_hash == initial_hash
+
+
+def test_game_log_rejects_invalid_turns(test_range_gamestate, codec):
+    game_log = GameLog(test_range_gamestate, codec)
+
+    with pytest.raises(InvalidTurnException):
+        game_log.append([PlaceMineAction(Hexagon(5, -3))], "p1")
+    assert len(game_log) == 0
+
+
+def test_game_log_recovers_from_file(test_range_gamestate, codec, tmpdir):
+    path = str(tmpdir.join("game.log"))
+    with open(path, "wb") as f:
+        game_log = GameLog(test_range_gamestate, codec, snapshot_interval=2, file=f)
+        play_turns(game_log)
+        # A turn the writer crashed in the middle of writing
+        f.write(b"T\x10\x00")
+
+    with open(path, "r+b") as f:
+        recovered_log = GameLog.load(f, codec, snapshot_interval=2)
+        assert len(recovered_log) == 5
+        assert recovered_log.current_state.zobrist_hash == game_log.current_state.zobrist_hash
+
+        recovered_log.append([PassAction()], "p1")
+
+    with open(path, "rb") as f:
+        assert len(GameLog.load(f, codec, snapshot_interval=2)) == 6
+
+
+def test_game_log_without_initial_snapshot_is_corrupt(codec):
+    # The writer crashed in the middle of writing the first snapshot
+    with pytest.raises(CorruptGameLogException):
+        GameLog.load(BytesIO(b"S\x40\x00"), codec)
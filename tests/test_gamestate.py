@@ -3,6 +3,8 @@ import pytest
 from gaia.gamestate.gamestate import ResearchBoard
 from gaia.utils.enums import ResearchTracks
 from gaia.gamestate.players import Income
+from gaia.board.hexagons import Hexagon
+from gaia.turns.actions import PlaceMineAction
 from tests.util import get_research_bonus_func_for_track
 
 
@@ -43,3 +45,48 @@ def test_research_board_persistant_bonuses(track, level, bonus, test_player):
     board.place_player(test_player, track, level=level)
     bonus_func = get_research_bonus_func_for_track(track)
     assert bonus_func(board, test_player) == bonus
+
+
+def test_gamestate_apply_action_leaves_original_unchanged(test_range_gamestate):
+    action = PlaceMineAction(Hexagon(1, 1))
+    next_gamestate = test_range_gamestate.apply_action(action, "p1")
+
+    assert next_gamestate.game_map.get_hexagon(Hexagon(1, 1)).planet.building is not None
+    assert test_range_gamestate.game_map.get_hexagon(Hexagon(1, 1)).planet.building is None
+    assert next_gamestate.research_board is test_range_gamestate.research_board
+    assert next_gamestate.players["p1"] == test_range_gamestate.players["p1"]
+    assert next_gamestate.players["p1"].player_resources is not test_range_gamestate.players["p1"].player_resources
+
+
+def test_gamestate_zobrist_hash_is_updated_incrementally(test_range_gamestate):
+    initial_hash = test_range_gamestate.zobrist_hash
+    assert test_range_gamestate.copy().zobrist_hash == initial_hash
+
+    delta = PlaceMineAction(Hexagon(1, 1)).create_delta(test_range_gamestate, "p1")
+    test_range_gamestate.apply(delta)
+    assert test_range_gamestate.zobrist_hash != initial_hash
+    test_range_gamestate.undo(delta)
+    assert test_range_gamestate.zobrist_hash == initial_hash
+
+    player = test_range_gamestate.players["p1"]
+    test_range_gamestate.research_board.place_player(player, ResearchTracks.NAVIGATION, level=2)
+    assert test_range_gamestate.zobrist_hash != initial_hash
+    test_range_gamestate.research_board.place_player(player, ResearchTracks.NAVIGATION, level=0)
+    assert test_range_gamestate.zobrist_hash == initial_hash
+
+    player.player_resources.gain_power(1)
+    assert test_range_gamestate.zobrist_hash != initial_hash
+
+
+def test_research_board_batched_queries(default_players):
+    board = ResearchBoard()
+    p1, p2 = default_players["p1"], default_players["p2"]
+    board.place_player(p1, ResearchTracks.NAVIGATION, level=5)
+    board.place_player(p2, ResearchTracks.ECONOMY, level=2)
+    board.place_player(p1.copy(), ResearchTracks.SCIENCE, level=3)
+
+    assert board.players == [p1, p2]
+    assert list(board.get_navigation_abilities()) == [4, 1]
+    assert list(board.get_science_bonuses()) == [3, 0]
+    assert [Income(*bonus) for bonus in board.get_economy_bonuses()] == [Income(), Income(ore=1, credits=2, power=2)]
+    assert [tuple(row) for row in board.get_available_gaiaformers_and_costs()] == [(0, 0), (0, 0)]
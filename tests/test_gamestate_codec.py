@@ -0,0 +1,76 @@
+import pytest
+import numpy as np
+
+from gaia.board.hexagons import Hexagon
+from gaia.board.buildings import Building
+from gaia.gamestate.gamestate_codec import GameStateCodec
+from gaia.turns.bonuses import AvailableRoundBonuses
+from gaia.utils.enums import Factions, BuildingType, ResearchTracks
+
+
+@pytest.fixture()
+def codec(default_map):
+    return GameStateCodec(default_map.copy())
+
+
+def test_gamestate_codec_round_trip(codec, starting_gamestate):
+    player = starting_gamestate.players["p1"]
+    player.player_resources.gain_power(5)
+    player.round_bonus = AvailableRoundBonuses.from_ids([3]).round_bonuses[3]
+    starting_gamestate.research_board.place_player(player, ResearchTracks.NAVIGATION, level=3)
+    starting_gamestate.game_map.inhabit_planet(Hexagon(0, 1), Building(Factions.AMBAS, BuildingType.TRADING_STATION))
+
+    encoded = codec.to_bytes(starting_gamestate)
+    decoded = codec.decode(encoded)
+
+    assert len(encoded) == codec.dtype.itemsize < 512
+    assert decoded.zobrist_hash == starting_gamestate.zobrist_hash
+    assert decoded.players.keys() == starting_gamestate.players.keys()
+
+    decoded_player = decoded.players["p1"]
+    assert decoded_player == player
+    assert decoded_player.player_resources == player.player_resources
+    assert decoded_player.board_income == player.board_income
+    assert decoded_player.round_bonus.id == 3
+    assert decoded.research_board.get_player_navigation_ability(decoded_player) == 2
+    assert decoded.game_map.get_hexagon(Hexagon(0, 1)).planet.building == \
+        Building(Factions.AMBAS, BuildingType.TRADING_STATION)
+    assert decoded.round_bonuses.round_bonuses.keys() == starting_gamestate.round_bonuses.round_bonuses.keys()
+
+
+def test_gamestate_codec_records_can_be_stored_in_arrays(codec, starting_gamestate, tmpdir):
+    records = [codec.encode(starting_gamestate), codec.encode(starting_gamestate.copy())]
+    path = str(tmpdir.join("positions.bin"))
+    with open(path, "wb") as f:
+        for record in records:
+            f.write(record.tobytes())
+
+    stored = np.memmap(path, dtype=codec.dtype, mode="r")
+    assert len(stored) == len(records)
+    assert codec.decode(stored[1]).zobrist_hash == starting_gamestate.zobrist_hash
+
+
+def test_gamestate_codec_ignores_buildings_of_the_layout(starting_gamestate):
+    game_map = starting_gamestate.game_map
+    game_map.inhabit_planet(Hexagon(0, 1), Building(Factions.TERRANS, BuildingType.MINE))
+    codec = GameStateCodec(game_map.copy())
+
+    game_map.set_building(Hexagon(0, 1), None)
+    decoded = codec.decode(codec.to_bytes(starting_gamestate))
+
+    assert decoded.game_map.get_hexagon(Hexagon(0, 1)).planet.building is None
+    assert decoded.zobrist_hash == starting_gamestate.zobrist_hash
+
+
+def test_gamestate_codec_on_the_map_of_a_game_in_progress(starting_gamestate):
+    game_map = starting_gamestate.game_map
+    codec = GameStateCodec(game_map)
+    encoded = codec.to_bytes(starting_gamestate)
+    initial_hash = starting_gamestate.zobrist_hash
+
+    # Buildings placed on the map after the codec was built don't leak into decoded states
+    game_map.inhabit_planet(Hexagon(0, -1), Building(Factions.TERRANS, BuildingType.MINE))
+    decoded = codec.decode(encoded)
+
+    assert decoded.game_map.get_hexagon(Hexagon(0, -1)).planet.building is None
+    assert decoded.zobrist_hash == initial_hash
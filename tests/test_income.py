@@ -0,0 +1,45 @@
+import pytest
+
+from gaia.gamestate.income import get_income, get_incomes, apply_income_phase
+from gaia.gamestate.players import Income
+from gaia.turns.bonuses import AvailableRoundBonuses
+from gaia.utils.enums import ResearchTracks
+
+
+@pytest.fixture()
+def income_gamestate(starting_gamestate):
+    p1, p2 = starting_gamestate.players["p1"], starting_gamestate.players["p2"]
+    starting_gamestate.research_board.place_player(p1, ResearchTracks.ECONOMY, level=2)
+    starting_gamestate.research_board.place_player(p1, ResearchTracks.SCIENCE, level=3)
+    p2.round_bonus = AvailableRoundBonuses.from_ids([3]).round_bonuses[3]
+    return starting_gamestate
+
+
+def test_get_incomes_matches_get_income(income_gamestate):
+    players = list(income_gamestate.players.values())
+
+    assert get_income(income_gamestate, players[0]) == Income(ore=2, credits=2, knowledge=4, power=2)
+    assert get_income(income_gamestate, players[1]) == Income(ore=2, knowledge=1, power_tokens=2)
+    assert [tuple(row) for row in get_incomes(income_gamestate, players)] == \
+        [get_income(income_gamestate, player).to_tuple() for player in players]
+
+
+def test_income_phase(income_gamestate):
+    p1, p2 = income_gamestate.players["p1"], income_gamestate.players["p2"]
+    p1.player_resources.knowledge = 13
+
+    income_gamestate.apply_income_phase()
+
+    assert (p1.player_resources.ore, p1.player_resources.credits, p1.player_resources.knowledge) == (6, 17, 15)
+    assert p1.player_resources.power_bowls == {0: 2, 1: 6, 2: 0}
+    assert (p2.player_resources.ore, p2.player_resources.knowledge) == (6, 4)
+    assert p2.player_resources.power_bowls == {0: 6, 1: 4, 2: 0}
+
+
+def test_income_phase_across_games(income_gamestate):
+    other_gamestate = income_gamestate.copy()
+    apply_income_phase([income_gamestate, other_gamestate])
+
+    for player_id, player in income_gamestate.players.items():
+        assert other_gamestate.players[player_id].player_resources == player.player_resources
+    assert apply_income_phase([]) is None
@@ -0,0 +1,45 @@
+import pytest
+
+from gaia.utils.lru_cache import LRUCache
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache(max_size=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+
+    cache.put("c", 3)
+    assert "b" not in cache
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert len(cache) == 2
+
+
+def test_lru_cache_get_or_compute():
+    cache = LRUCache(max_size=2)
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return "value"
+
+    assert cache.get_or_compute("key", compute) == "value"
+    assert cache.get_or_compute("key", compute) == "value"
+    assert len(calls) == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_lru_cache_requires_positive_size():
+    with pytest.raises(AssertionError):
+        LRUCache(max_size=0)
+
+
+def test_lru_cache_reports_evictions():
+    evicted = []
+    cache = LRUCache(max_size=1, on_evict=lambda key, value: evicted.append((key, value)))
+    cache.put("a", 1)
+    cache.put("a", 2)
+    cache.put("b", 3)
+
+    assert evicted == [("a", 2)]
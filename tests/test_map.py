@@ -1,10 +1,19 @@
 import pytest
-from copy import copy
+from copy import copy, deepcopy
 import json
+import os
 
 from gaia.board.hexagons import Hexagon
 from gaia.board.sectors import Sector
+from gaia.board.map import Map
+from gaia.board.buildings import Building
+from gaia.board.federations import Federation
+from gaia.utils.enums import Factions, BuildingType
 from gaia.board.map_loader import GameTile, MapLoader
+from gaia.board.map_serializer import JSONEncoder, MapSerializer
+from gaia.utils.lru_cache import LRUCache
+from gaia.board.binary_map import encode_map, decode_map
+from gaia.board.compiled_layouts import CompiledLayouts, InvalidCompiledLayoutsException
 
 
 @pytest.mark.parametrize("hex1,hex2,distance", [
@@ -161,3 +170,393 @@ def test_map_to_json(default_map):
                    for hexagon in hexagons)
 
     assert map_json["federations"] == []
+
+
+@pytest.mark.parametrize("x_offset,z_offset", [
+    (0, 0),
+    (3, -5),
+    (-7, 2)
+])
+def test_map_get_hexagon_follows_sector_offset(planet_hexagons, x_offset, z_offset):
+    sector = Sector(planet_hexagons)
+    game_map = Map([sector], [])
+    sector.adjust_offset(x_offset, z_offset)
+
+    for hexagon in planet_hexagons:
+        map_hexagon = game_map.get_hexagon(hexagon.adjust_offset(x_offset, z_offset))
+        assert map_hexagon is not None
+        assert map_hexagon.planet == hexagon.planet
+
+    assert all(game_map.get_hexagon(h) is h for h in sector.hexagons)
+    assert game_map.get_hexagon(Hexagon(x_offset + 3, z_offset)) is None
+
+
+def test_map_get_hexagon_follows_sector_rotation(planet_hexagons):
+    sector = Sector(planet_hexagons)
+    game_map = Map([sector], [])
+    sector.rotate(60)
+
+    assert all(game_map.get_hexagon(h) is h for h in sector.hexagons)
+    assert all(sector.get_hexagon(h) is h for h in sector.hexagons)
+
+
+def test_hexagons_without_planets_are_interned():
+    assert Hexagon(2, -3) is Hexagon(2, -3)
+    assert Hexagon(0, 0).adjust_offset(2, -3) is Hexagon(2, -3)
+    assert Hexagon(0, -5).rotate(60) is Hexagon(5, -5)
+    assert all(h is Hexagon(h.x, h.z) for h in Hexagon(0, 0).get_hexagons_in_range(2))
+
+
+def test_hexagons_have_no_instance_dict(planet_hexagons):
+    assert not hasattr(Hexagon(0, 0), "__dict__")
+    assert not hasattr(list(planet_hexagons)[0], "__dict__")
+
+
+def test_hexagon_with_planet_is_distinct_but_equal(planet_hexagons):
+    for hexagon in planet_hexagons:
+        assert hexagon is not Hexagon(hexagon.x, hexagon.z)
+        assert hexagon == Hexagon(hexagon.x, hexagon.z)
+        assert hash(hexagon) == hash(Hexagon(hexagon.x, hexagon.z))
+        assert deepcopy(hexagon).planet == hexagon.planet
+
+
+@pytest.mark.parametrize("center,distance", [
+    (Hexagon(0, 0), 0),
+    (Hexagon(0, 0), 1),
+    (Hexagon(3, -2), 2),
+    (Hexagon(-4, 1), 5)
+])
+def test_hexagon_ring_and_spiral(center, distance):
+    ring = list(center.ring(distance))
+    spiral = list(center.spiral(distance))
+
+    assert len(ring) == max(1, 6 * distance) == len(set(ring))
+    assert all(center.distance(h) == distance for h in ring)
+    assert len(spiral) == 3 * distance * (distance + 1) + 1 == len(set(spiral))
+    assert [center.distance(h) for h in spiral] == sorted(center.distance(h) for h in spiral)
+    assert center.get_hexagons_in_range(distance) == set(spiral)
+
+
+@pytest.mark.integration
+@pytest.mark.parametrize("center,distance", [
+    (Hexagon(0, 0), 3),
+    (Hexagon(5, -3), 4),
+    (Hexagon(12, 12), 2)
+])
+def test_map_get_hexagons_in_range(default_map, center, distance):
+    expected = {default_map.get_hexagon(h) for h in center.get_hexagons_in_range(distance)} - {None}
+    hexagons_in_range = default_map.get_hexagons_in_range(center, distance)
+
+    assert hexagons_in_range == expected
+    assert all(default_map.get_hexagon(h) is h for h in hexagons_in_range)
+
+
+def test_map_faction_index_tracks_buildings(planet_hexagons):
+    sector = Sector(planet_hexagons, radius=10)
+    game_map = Map([sector], [])
+    assert game_map.get_faction_hexagons(Factions.AMBAS) == {Hexagon(-1, 1)}
+
+    game_map.inhabit_planet(Hexagon(0, 2), Building(Factions.TERRANS, BuildingType.MINE))
+    game_map.inhabit_planet(Hexagon(-1, 1), Building(Factions.TERRANS, BuildingType.TRADING_STATION))
+    assert game_map.get_faction_hexagons(Factions.AMBAS) == set()
+    assert game_map.get_faction_hexagons(Factions.TERRANS) == {Hexagon(0, 2), Hexagon(-1, 1)}
+
+    sector.adjust_offset(2, 0)
+    assert game_map.get_faction_hexagons(Factions.TERRANS) == {Hexagon(2, 2), Hexagon(1, 1)}
+
+
+@pytest.mark.parametrize("faction,hexagon,distance,in_range", [
+    (Factions.AMBAS, Hexagon(-1, 1), 0, True),
+    (Factions.AMBAS, Hexagon(0, 1), 1, True),
+    (Factions.AMBAS, Hexagon(0, 2), 1, False),
+    (Factions.AMBAS, Hexagon(3, 0), 3, False),
+    (Factions.AMBAS, Hexagon(3, 0), 4, True),
+    (Factions.AMBAS, Hexagon(3, 0), 30, True),
+    (Factions.TERRANS, Hexagon(0, 0), 30, False)
+])
+def test_map_faction_has_building_in_range(planet_hexagons, faction, hexagon, distance, in_range):
+    game_map = Map([Sector(planet_hexagons, radius=10)], [])
+    assert game_map.faction_has_building_in_range(faction, hexagon, distance) == in_range
+
+
+@pytest.mark.integration
+@pytest.mark.parametrize("navigation_range,extra_range", [
+    (1, 0),
+    (2, 0),
+    (2, 4),
+    (4, 6)
+])
+def test_map_get_reachable_planets(default_map, navigation_range, extra_range):
+    default_map.inhabit_planet(Hexagon(0, 1), Building(Factions.TERRANS, BuildingType.MINE))
+    default_map.inhabit_planet(Hexagon(5, -3), Building(Factions.TERRANS, BuildingType.MINE))
+    default_map.inhabit_planet(Hexagon(1, 1), Building(Factions.AMBAS, BuildingType.MINE))
+
+    reachable_planets = default_map.get_reachable_planets(Factions.TERRANS, navigation_range, extra_range)
+
+    expected = dict()
+    for sector in default_map.sectors:
+        for hexagon in sector.hexagons:
+            if hexagon.planet is None or hexagon.planet.is_inhabited():
+                continue
+            for extra in range(extra_range + 1):
+                if default_map.faction_has_building_in_range(Factions.TERRANS, hexagon, navigation_range + extra):
+                    expected[hexagon] = extra
+                    break
+
+    assert reachable_planets == expected
+    assert all(default_map.get_hexagon(h) is h for h in reachable_planets)
+
+
+@pytest.mark.integration
+def test_map_loader_hands_out_independent_copies(config_path):
+    map_1 = MapLoader.load_from_config(config_path=config_path, game_type="1p_2p_default")
+    map_2 = MapLoader.load_from_config(config_path=config_path, game_type="1p_2p_default")
+    assert map_1 is not map_2
+
+    assert map_1.inhabit_planet(Hexagon(0, 1), Building(Factions.TERRANS, BuildingType.MINE))
+    assert map_1.get_hexagon(Hexagon(0, 1)).planet.is_inhabited()
+    assert not map_2.get_hexagon(Hexagon(0, 1)).planet.is_inhabited()
+
+    map_3 = MapLoader.load_from_config(config_path=config_path, game_type="1p_2p_default")
+    assert not map_3.get_hexagon(Hexagon(0, 1)).planet.is_inhabited()
+    assert map_3.get_faction_hexagons(Factions.TERRANS) == set()
+
+
+@pytest.mark.integration
+def test_map_loader_reloads_changed_config(config_path, tmpdir):
+    with open(config_path) as config_file:
+        config = json.load(config_file)
+    copied_config_path = str(tmpdir.join("board.json"))
+    with open(copied_config_path, "w") as config_file:
+        json.dump(config, config_file)
+
+    assert len(MapLoader.load_from_config(copied_config_path, game_type="1p_2p_default").sectors) == 7
+
+    config["1p_2p_default"]["tiles"].pop()
+    with open(copied_config_path, "w") as config_file:
+        json.dump(config, config_file)
+    os.utime(copied_config_path, ns=(0, 0))
+
+    assert len(MapLoader.load_from_config(copied_config_path, game_type="1p_2p_default").sectors) == 6
+
+
+@pytest.mark.integration
+@pytest.mark.parametrize("game_type", ["1p_2p_default", "3p_4p_default"])
+def test_map_load_from_compiled(config_path, tmpdir, game_type):
+    compiled_path = str(tmpdir.join("board.bin"))
+    MapLoader.compile_config(config_path, compiled_path)
+
+    expected = MapLoader.load_from_config(config_path, game_type=game_type)
+    compiled_map = MapLoader.load_from_compiled(compiled_path, game_type)
+
+    assert len(compiled_map.sectors) == len(expected.sectors)
+    for sector, expected_sector in zip(compiled_map.sectors, expected.sectors):
+        assert (sector.x_offset, sector.z_offset, sector.radius) == \
+               (expected_sector.x_offset, expected_sector.z_offset, expected_sector.radius)
+        assert sector.hexagons == expected_sector.hexagons
+        assert all(h.planet == expected_sector.get_hexagon(h).planet for h in sector.hexagons)
+
+
+def test_compiled_layouts_rejects_other_files(tmpdir):
+    path = str(tmpdir.join("board.json"))
+    with open(path, "w") as not_compiled:
+        not_compiled.write("{\"tiles\": []}")
+
+    with pytest.raises(InvalidCompiledLayoutsException):
+        CompiledLayouts(path)
+
+
+@pytest.mark.parametrize("x_offset,z_offset,rotations", [
+    (0, 0, [60]),
+    (3, -5, [120]),
+    (-2, 4, [60, 60, 240]),
+    (5, 1, [300, 60])
+])
+def test_sector_rotation_keeps_planets_and_center(planet_hexagons, x_offset, z_offset, rotations):
+    sector = Sector(planet_hexagons, x_offset=x_offset, z_offset=z_offset)
+    for degrees in rotations:
+        sector.rotate(degrees)
+    total_degrees = sum(rotations)
+
+    assert sector.rotation == (total_degrees // 60) % 6
+    assert all(h.distance(Hexagon(x_offset, z_offset)) <= 2 for h in sector.hexagons)
+    for hexagon in planet_hexagons:
+        rotated = hexagon.rotate(total_degrees).adjust_offset(x_offset, z_offset)
+        assert sector.get_hexagon(rotated).planet is hexagon.planet
+
+    sector.rotate(360 - total_degrees % 360)
+    assert sector.hexagons == Sector(planet_hexagons, x_offset=x_offset, z_offset=z_offset).hexagons
+
+
+@pytest.mark.integration
+def test_planet_distance_matrix(default_map):
+    planet_distances = default_map.get_planet_distances()
+    planets = [h for sector in default_map.sectors for h in sector.hexagons if h.planet is not None]
+
+    assert planet_distances.distances.shape == (len(planets), len(planets))
+    assert all(planet_distances.distance(h1, h2) == h1.distance(h2) for h1 in planets for h2 in planets)
+
+
+@pytest.mark.integration
+def test_planet_distance_matrix_is_shared_per_layout(config_path):
+    map_1 = MapLoader.load_from_config(config_path=config_path, game_type="1p_2p_default")
+    map_2 = MapLoader.load_from_config(config_path=config_path, game_type="1p_2p_default")
+    assert map_1.get_planet_distances() is map_2.get_planet_distances()
+
+    map_1.sectors[0].rotate(60)
+    assert map_1.get_planet_distances() is not map_2.get_planet_distances()
+
+
+@pytest.mark.integration
+@pytest.mark.parametrize("hexagon,distance", [
+    (Hexagon(0, 1), 0),
+    (Hexagon(1, 1), 1),
+    (Hexagon(5, -3), 2),
+    (Hexagon(5, -3), 6)
+])
+def test_map_faction_range_with_planet_distances(config_path, hexagon, distance):
+    game_map = MapLoader.load_from_config(config_path=config_path, game_type="1p_2p_default")
+    game_map.inhabit_planet(Hexagon(0, 1), Building(Factions.TERRANS, BuildingType.MINE))
+
+    expected = any(h.distance(hexagon) <= distance for h in game_map.get_faction_hexagons(Factions.TERRANS))
+    assert game_map.faction_has_building_in_range(Factions.TERRANS, hexagon, distance) == expected
+
+
+@pytest.mark.integration
+def test_map_to_json_matches_object_serialization(default_map):
+    default_map.inhabit_planet(Hexagon(0, 1), Building(Factions.TERRANS, BuildingType.MINE))
+    default_map.inhabit_planet(Hexagon(1, 1), Building(Factions.AMBAS, BuildingType.ACADEMY))
+
+    expected = json.loads(json.dumps({"sectors": default_map.sectors, "federations": default_map.federations},
+                                     cls=JSONEncoder))
+    map_json = json.loads(default_map.to_json())
+
+    def sort_hexagons(map_json):
+        for sector in map_json["sectors"]:
+            sector["hexagons"].sort(key=lambda h: (h["x"], h["z"]))
+        return map_json
+
+    assert sort_hexagons(map_json) == sort_hexagons(expected)
+    assert sort_hexagons(json.loads(default_map.to_json())) == map_json
+
+
+def test_map_serializer_fragment_caches_are_bounded(default_map, mocker):
+    expected = default_map.to_json()
+    mocker.patch.object(MapSerializer, "_hexagon_fragments", LRUCache(max_size=8))
+    mocker.patch.object(MapSerializer, "_planet_fragments", LRUCache(max_size=2))
+
+    assert default_map.to_json() == expected
+    assert len(MapSerializer._hexagon_fragments) == 8
+    assert len(MapSerializer._planet_fragments) == 2
+
+
+@pytest.mark.integration
+def test_map_version_changes_with_map(default_map):
+    version = default_map.version
+    assert default_map.copy().version == version
+
+    default_map.inhabit_planet(Hexagon(0, 1), Building(Factions.TERRANS, BuildingType.MINE))
+    assert default_map.version > version
+    version = default_map.version
+
+    default_map.sectors[0].rotate(60)
+    assert default_map.version > version
+    assert default_map.copy().version == default_map.version
+
+
+@pytest.mark.integration
+def test_map_copy_carries_indexes_over(default_map, mocker):
+    default_map.inhabit_planet(Hexagon(0, 1), Building(Factions.TERRANS, BuildingType.MINE))
+    index_sector_hexagons = mocker.spy(Map, "_index_sector_hexagons")
+    map_copy = default_map.copy()
+    assert index_sector_hexagons.call_count == 0
+
+    map_copy.inhabit_planet(Hexagon(0, 1), Building(Factions.XENOS, BuildingType.MINE))
+    map_copy.sectors[1].rotate(60)
+    rebuilt = Map(map_copy.sectors, map_copy.federations)
+
+    assert map_copy.zobrist_hash == rebuilt.zobrist_hash
+    assert map_copy.get_faction_hexagons(Factions.XENOS) == rebuilt.get_faction_hexagons(Factions.XENOS)
+    assert not map_copy.get_faction_hexagons(Factions.TERRANS)
+    assert map_copy._hexagon_index == rebuilt._hexagon_index
+    assert map_copy._sector_index == rebuilt._sector_index
+    assert default_map.get_faction_hexagons(Factions.TERRANS) == {default_map.get_hexagon(Hexagon(0, 1))}
+
+
+@pytest.mark.integration
+def test_map_layout_hash_only_changes_with_layout(default_map):
+    layout_hash = default_map.layout_hash
+    default_map.inhabit_planet(Hexagon(0, 1), Building(Factions.TERRANS, BuildingType.MINE))
+    assert default_map.layout_hash == layout_hash
+    assert default_map.copy().layout_hash == layout_hash
+
+    default_map.sectors[1].rotate(60)
+    assert default_map.layout_hash != layout_hash
+    default_map.sectors[1].rotate(300)
+    assert default_map.layout_hash == layout_hash
+
+
+@pytest.mark.integration
+def test_map_changes_since(default_map):
+    version = default_map.version
+    assert default_map.changes_since(version) == []
+    assert default_map.changes_since(version + 1) is None
+
+    default_map.inhabit_planet(Hexagon(0, 1), Building(Factions.TERRANS, BuildingType.MINE))
+    default_map.sectors[2].rotate(120)
+    default_map.add_federation(Federation([Hexagon(0, 1)], Factions.TERRANS))
+
+    changes = default_map.changes_since(version)
+    assert [change["type"] for change in changes] == ["building", "sector", "federation"]
+    assert [change["version"] for change in changes] == [version + 1, version + 2, version + 3]
+    assert (changes[0]["x"], changes[0]["z"]) == (0, 1)
+    assert changes[0]["building"] == Building(Factions.TERRANS, BuildingType.MINE)
+    assert changes[1]["index"] == 2
+    assert changes[1]["sector"]["hexagons"] == list(default_map.sectors[2].hexagons)
+    assert default_map.changes_since(version + 2) == changes[2:]
+
+
+def test_map_changes_since_falls_back_when_too_far_behind(planet_hexagons):
+    game_map = Map([Sector(planet_hexagons)], [])
+    for i in range(Map.MAX_CHANGE_LOG_LENGTH + 1):
+        game_map.inhabit_planet(Hexagon(0, 0), Building(Factions.TERRANS, BuildingType(i % 5)))
+
+    assert game_map.changes_since(0) is None
+    assert len(game_map.changes_since(1)) == Map.MAX_CHANGE_LOG_LENGTH
+
+
+@pytest.mark.integration
+def test_binary_map_round_trip(default_map):
+    default_map.inhabit_planet(Hexagon(0, 1), Building(Factions.TERRANS, BuildingType.MINE))
+    default_map.add_federation(Federation([Hexagon(0, 1), Hexagon(1, 1)], Factions.TERRANS))
+
+    encoded = encode_map(default_map)
+    decoded = decode_map(encoded)
+    expected = json.loads(default_map.to_json())
+
+    assert len(encoded) < len(default_map.to_json()) / 5
+    assert decoded["version"] == default_map.version
+    for sector, expected_sector in zip(decoded["sectors"], expected["sectors"]):
+        assert {k: v for k, v in sector.items() if k != "hexagons"} == \
+               pytest.approx({k: v for k, v in expected_sector.items() if k != "hexagons"})
+        for hexagon in expected_sector["hexagons"]:
+            decoded_hexagon = next(h for h in sector["hexagons"] if (h["x"], h["z"]) == (hexagon["x"], hexagon["z"]))
+            assert decoded_hexagon["planet"] == hexagon["planet"]
+            assert decoded_hexagon["screen_y_factor"] == pytest.approx(hexagon["screen_y_factor"])
+
+    assert decoded["federations"] == [{"faction": Factions.TERRANS, "activated": False,
+                                       "hexagons": [{"x": 0, "z": 1}, {"x": 1, "z": 1}]}]
+
+
+def test_binary_map_round_trip_with_large_sector(one_sector_map):
+    decoded = decode_map(encode_map(one_sector_map))
+    sector = one_sector_map.sectors[0]
+
+    assert len(sector.hexagons) > 255
+    assert len(decoded["sectors"][0]["hexagons"]) == len(sector.hexagons)
+    assert {(h["x"], h["z"]) for h in decoded["sectors"][0]["hexagons"]} == {(h.x, h.z) for h in sector.hexagons}
+
+
+def test_binary_map_refuses_coordinates_out_of_range(planet_hexagons):
+    with pytest.raises(AssertionError):
+        encode_map(Map([Sector(planet_hexagons, x_offset=200)], []))
@@ -0,0 +1,75 @@
+import pytest
+from collections import Counter
+
+from gaia.board.hexagons import Hexagon
+from gaia.board.map_loader import MapLoader
+from gaia.board.map_generator import COLORED_PLANET_TYPES
+
+
+def score_map(game_map):
+    same_color_adjacencies = 0
+    for hexagon in game_map._hexagon_index.values():
+        for neighbour in hexagon.ring(1):
+            map_neighbour = game_map.get_hexagon(neighbour)
+            if hexagon.planet is not None and map_neighbour is not None and map_neighbour.planet is not None and \
+                    hexagon.planet.planet_type in COLORED_PLANET_TYPES and \
+                    hexagon.planet.planet_type == map_neighbour.planet.planet_type:
+                same_color_adjacencies += 1
+
+    sector_duplicate_colors = 0
+    for sector in game_map.sectors:
+        counts = Counter(h.planet.planet_type for h in sector.hexagons
+                         if h.planet is not None and h.planet.planet_type in COLORED_PLANET_TYPES)
+        sector_duplicate_colors += sum(count - 1 for count in counts.values())
+
+    return same_color_adjacencies // 2 + sector_duplicate_colors
+
+
+@pytest.fixture()
+def map_generator(config_path):
+    generator = MapLoader.get_map_generator(config_path)
+    generator.seed(42)
+    return generator
+
+
+@pytest.mark.integration
+@pytest.mark.parametrize("random_sides", [False, True])
+def test_generated_layouts_match_scores(map_generator, random_sides, monkeypatch):
+    monkeypatch.setattr(map_generator, "random_sides", random_sides)
+    layouts = map_generator.random_layouts(50)
+    scores = map_generator.score_layouts(layouts)
+
+    for i in range(len(scores)):
+        game_map = map_generator.to_map(layouts, i)
+        assert len(game_map._hexagon_index) == sum(len(sector.hexagons) for sector in game_map.sectors)
+        assert scores[i] == score_map(game_map)
+
+
+@pytest.mark.integration
+def test_generate_balanced_layouts(map_generator):
+    layouts = map_generator.generate_balanced_layouts(20, max_score=0)
+
+    assert len(layouts.tiles) == 20
+    assert (map_generator.score_layouts(layouts) == 0).all()
+
+
+@pytest.mark.integration
+def test_random_map_from_config_is_seedable(config_path):
+    map_1 = MapLoader.load_from_config(config_path, seed=7)
+    map_2 = MapLoader.load_from_config(config_path, seed=7)
+
+    assert [(s.x_offset, s.z_offset) for s in map_1.sectors] == [(s.x_offset, s.z_offset) for s in map_2.sectors]
+    for sector_1, sector_2 in zip(map_1.sectors, map_2.sectors):
+        assert {(h, h.planet.planet_type) for h in sector_1.hexagons if h.planet} == \
+               {(h, h.planet.planet_type) for h in sector_2.hexagons if h.planet}
+    assert all(map_1.get_hexagon(Hexagon(s.x_offset, s.z_offset)) is not None for s in map_1.sectors)
+
+
+@pytest.mark.integration
+def test_seeded_random_maps_do_not_reseed_the_shared_generator(config_path):
+    generator = MapLoader.get_map_generator(config_path)
+    state_before = generator._random.get_state()[1].copy()
+
+    MapLoader.load_from_config(config_path, seed=7)
+
+    assert (generator._random.get_state()[1] == state_before).all()
@@ -1,5 +1,6 @@
 import pytest
-from gaia.gamestate.players import PlayerResources
+from gaia.gamestate.players import PlayerResources, Cost, Income
+from gaia.gamestate.power import get_power_payment
 
 
 @pytest.mark.parametrize("power_before, gain_amount, power_after, description", [
@@ -22,3 +23,67 @@ def test_gain_power(power_before, gain_amount, power_after, description, default
     default_player_resources.power_bowls = power_before
     default_player_resources.gain_power(gain_amount)
     assert default_player_resources.power_bowls == power_after, "Failed: " + description
+
+
+def test_player_copy_has_own_resources(test_player):
+    player_copy = test_player.copy()
+    player_copy.player_resources.ore -= 1
+    player_copy.player_resources.gain_power(2)
+
+    assert player_copy == test_player
+    assert test_player.player_resources == PlayerResources(ore=4, credits=15, knowledge=3, qic=1,
+                                                           power_bowls={0: 4, 1: 4, 2: 0})
+
+
+@pytest.mark.parametrize("cost, affordable", [
+    (Cost(), True),
+    (Cost(ore=4, credits=15, knowledge=3, qic=1), True),
+    (Cost(ore=5), False),
+    (Cost(qic=2), False),
+    (Cost(power=2), True),
+    (Cost(power=3), False),
+    (Cost(power_tokens=8), True),
+    (Cost(power_tokens=9), False),
+])
+def test_player_can_afford(cost, affordable, test_player):
+    assert test_player.can_afford(cost) == affordable
+    assert list(test_player.affordable([cost, cost])) == [affordable, affordable]
+
+
+def test_resource_vectors():
+    assert Cost(ore=1, credits=2) + Cost(qic=1) == Cost(ore=1, credits=2, qic=1)
+    assert Cost(ore=1) != Income(ore=1)
+    assert Income(credits=2)["credits"] == 2
+    assert repr(Income(ore=1)) == "Income(ore=1, credits=0, knowledge=0, qic=0, power=0, power_tokens=0)"
+
+
+@pytest.mark.parametrize("bowls, power, payment", [
+    ((0, 0, 3), 3, 0),
+    ((0, 4, 1), 3, 2),
+    ((0, 3, 1), 3, None),
+    ((4, 4, 0), 0, 0),
+])
+def test_power_payment(bowls, power, payment):
+    assert get_power_payment(bowls, power) == payment
+
+
+def test_spend_power_burns_as_needed(default_player_resources):
+    default_player_resources.power_bowls = {0: 1, 1: 4, 2: 1}
+    default_player_resources.spend_power(2)
+    assert default_player_resources.power_bowls == {0: 3, 1: 2, 2: 0}
+
+
+def test_charge_power_costs_victory_points(default_player_resources):
+    default_player_resources.power_bowls = {0: 1, 1: 1, 2: 0}
+    assert default_player_resources.charge_power(5) == 2
+    assert default_player_resources.power_bowls == {0: 0, 1: 0, 2: 2}
+    assert default_player_resources.charge_power(1) == 0
+
+
+def test_add_and_remove_power_tokens(default_player_resources):
+    default_player_resources.add_power_tokens(2)
+    assert default_player_resources.power_bowls == {0: 6, 1: 4, 2: 0}
+    default_player_resources.remove_power_tokens(8)
+    assert default_player_resources.power_bowls == {0: 0, 1: 2, 2: 0}
+    default_player_resources.burn_power(1)
+    assert default_player_resources.power_bowls == {0: 0, 1: 0, 2: 1}
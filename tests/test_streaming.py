@@ -0,0 +1,124 @@
+import pytest
+import threading
+
+from gaia.utils.streaming import GameStream, StreamEvent
+
+
+class StandInClient(object):
+    """
+    Stands in for a connected client, collecting the events of its subscription
+    """
+    def __init__(self, stream):
+        self.subscription = stream.subscribe()
+        self.events = []
+
+    def read_available(self):
+        event = self.subscription.get(timeout=0)
+        while event is not None:
+            self.events.append(event)
+            event = self.subscription.get(timeout=0)
+        return [(event.kind, event.data) for event in self.events]
+
+
+@pytest.fixture()
+def state():
+    return {"version": 0}
+
+
+@pytest.fixture()
+def stream(state):
+    return GameStream(lambda: StreamEvent("snapshot", dict(state)), max_queue_size=3)
+
+
+def publish_change(stream, state):
+    state["version"] += 1
+    stream.publish(StreamEvent("change", state["version"]))
+    stream.publish(StreamEvent("valid-moves", state["version"], latest_only=True))
+
+
+def test_subscribers_get_snapshot_then_changes(stream, state):
+    client = StandInClient(stream)
+    publish_change(stream, state)
+
+    assert client.read_available() == [("snapshot", {"version": 0}), ("change", 1), ("valid-moves", 1)]
+
+
+def test_latest_only_events_are_coalesced(stream, state):
+    client = StandInClient(stream)
+    client.read_available()
+
+    stream.publish(StreamEvent("valid-moves", 1, latest_only=True))
+    stream.publish(StreamEvent("valid-moves", 2, latest_only=True))
+    assert client.read_available()[1:] == [("valid-moves", 2)]
+
+
+def test_slow_subscriber_is_resynced_with_snapshot(stream, state):
+    fast_client, slow_client = StandInClient(stream), StandInClient(stream)
+
+    for i in range(5):
+        publish_change(stream, state)
+        fast_client.read_available()
+
+    assert slow_client.read_available() == [("snapshot", {"version": 5}), ("valid-moves", 5)]
+    assert [kind for kind, data in fast_client.read_available()].count("change") == 5
+
+
+def test_unsubscribe_stops_delivery(stream, state):
+    client = StandInClient(stream)
+    stream.unsubscribe(client.subscription)
+    publish_change(stream, state)
+
+    assert client.subscription.closed
+    assert client.read_available() == []
+    assert stream.num_subscribers == 0
+
+
+def test_close_ends_all_subscriptions(stream, state):
+    clients = [StandInClient(stream), StandInClient(stream)]
+    stream.close()
+    publish_change(stream, state)
+
+    assert all(client.subscription.closed for client in clients)
+    assert stream.num_subscribers == 0
+
+
+def test_blocked_reader_is_woken_by_publish(stream, state):
+    client = StandInClient(stream)
+    client.read_available()
+    received = []
+
+    reader = threading.Thread(target=lambda: received.append(client.subscription.get(timeout=5)))
+    reader.start()
+    publish_change(stream, state)
+    reader.join(timeout=5)
+
+    assert received[0].kind == "change"
+
+
+def test_event_to_sse():
+    assert StreamEvent("change", {"version": 1}).to_sse() == 'event: change\ndata: {"version": 1}\n\n'
+
+
+def test_resync_snapshot_is_taken_without_blocking_producers(state):
+    game_lock = threading.Lock()
+
+    def snapshot():
+        with game_lock:
+            return StreamEvent("snapshot", dict(state))
+
+    stream = GameStream(snapshot, max_queue_size=1)
+    client = StandInClient(stream)
+    with game_lock:
+        publish_change(stream, state)
+        publish_change(stream, state)
+
+    received = []
+    reader = threading.Thread(target=lambda: received.append(client.subscription.get(timeout=5)))
+    with game_lock:
+        reader.start()
+        # The reader waits for the game lock to take its snapshot, while changes can still be published
+        publish_change(stream, state)
+    reader.join(timeout=5)
+
+    assert received[0].kind == "snapshot"
+    assert received[0].data == {"version": 3}
@@ -5,6 +5,7 @@ from gaia.turns.actions import (PlaceMineAction, PassAction, GaiaformAction,
                           GainRangeAction, ExchangeOreForCreditAction,
                           StartGaiaProjectAction)
 from gaia.board.hexagons import Hexagon
+from gaia.utils.transposition_cache import TranspositionCache
 
 
 @pytest.mark.parametrize("actions,should_be_valid,main_reason", [
@@ -135,3 +136,38 @@ def test_final_action_modification(actions, should_be_valid,
     turn = Turn(actions, test_range_gamestate, "p1")
     valid, reasons = turn.validate()
     assert valid == should_be_valid
+
+
+def test_validation_is_memoized_by_state_hash(test_range_gamestate):
+    cache = TranspositionCache(max_size=8)
+    actions = [GainRangeAction(), PlaceMineAction(Hexagon(0, -1))]
+
+    first_turn = Turn(list(actions), test_range_gamestate, "p1")
+    second_turn = Turn(list(actions), test_range_gamestate.copy(), "p1")
+
+    assert first_turn.validate(cache) == (True, [])
+    assert second_turn.validate(cache) == (True, [])
+    assert (cache.hits, cache.misses) == (1, 1)
+    # Only the verdict is shared, each turn modifies its own final action
+    assert second_turn.actions[-1].base_navigation == GainRangeAction.NAVIGATION_BONUS
+    assert second_turn.actions[-1] is not first_turn.actions[-1]
+    assert second_turn.actions[0] is actions[0]
+
+    test_range_gamestate.players["p1"].player_resources.ore = 0
+    assert Turn(list(actions), test_range_gamestate, "p1").validate(cache)[0] is False
+    assert cache.misses == 2
+
+
+def test_validation_is_not_shared_between_layouts(test_range_gamestate):
+    cache = TranspositionCache(max_size=8)
+    actions = [PlaceMineAction(Hexagon(0, -1))]
+    rotated_gamestate = test_range_gamestate.copy()
+    game_map = rotated_gamestate.game_map
+    next(sector for sector in game_map.sectors if Hexagon(0, 1) not in sector.hexagons).rotate(60)
+
+    assert rotated_gamestate.zobrist_hash == test_range_gamestate.zobrist_hash
+    assert game_map.layout_hash != test_range_gamestate.game_map.layout_hash
+
+    Turn(list(actions), test_range_gamestate, "p1").validate(cache)
+    Turn(list(actions), rotated_gamestate, "p1").validate(cache)
+    assert (cache.hits, cache.misses) == (0, 2)